@@ -0,0 +1,57 @@
+"""
+Build Tool Embeddings
+Export the tool embeddings from ChromaDB as a static float16 NumPy array,
+saved with the digest of the tool documents they were computed from
+
+The tool descriptions never change at runtime, so their embeddings only need
+to be computed once. ToolManager loads the exported matrix and ranks tools
+with a single dot product instead of a ChromaDB index query. When a tool's
+name, description or parameters change, the digest no longer matches and
+ToolManager falls back to ChromaDB until this script is rerun.
+"""
+
+import logging
+import os
+import sys
+import numpy as np
+from tool_manager import initialize_tool_database, build_tool_document, tool_documents_digest, TOOL_EMBEDDINGS_FILE
+from ecommerce_tools import TOOL_NAMES, TOOL_SCHEMAS
+
+
+def build_tool_embeddings(persist_directory: str = "./chroma_db") -> str:
+    """
+    Export the embeddings of all tools, one row per tool in ToolId order
+
+    Tools whose stored document differs from the current tool definition are
+    re-embedded and written back to ChromaDB first, so the digest is never
+    stamped onto stale vectors.
+
+    Args:
+        persist_directory: Directory of the ChromaDB tool database
+
+    Returns:
+        Path of the written .npz file
+    """
+    manager = initialize_tool_database(persist_directory=persist_directory)
+    manager.refresh_tool_embeddings()
+    stored = manager.collection.get(ids=list(TOOL_NAMES), include=["documents", "embeddings"])
+
+    rows = dict(zip(stored["ids"], stored["embeddings"]))
+    documents = dict(zip(stored["ids"], stored["documents"]))
+    stale = [tool_name for tool_name in TOOL_NAMES
+             if documents.get(tool_name) != build_tool_document(tool_name, TOOL_SCHEMAS[tool_name])]
+    if stale:
+        raise ValueError(f"Tools missing or out of date in the collection: {stale}")
+
+    # float16 halves the file; rows are unit-normalized, so precision loss only affects near-ties
+    matrix = np.stack([rows[tool_name] for tool_name in TOOL_NAMES]).astype(np.float16)
+
+    path = os.path.join(persist_directory, TOOL_EMBEDDINGS_FILE)
+    np.savez(path, embeddings=matrix, digest=np.array(tool_documents_digest()))
+    print(f"✓ Saved {matrix.shape[0]} tool embeddings ({matrix.shape[1]}-d, float16) to {path}")
+    return path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    build_tool_embeddings()
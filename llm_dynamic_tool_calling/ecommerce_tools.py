@@ -3,9 +3,23 @@ E-commerce Platform Management Tools
 70 tools across 5 categories for LLM agent demonstration
 """
 
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
-from enum import Enum
+import sys
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Annotated, Final, Iterable, Literal, Mapping, Tuple, Union
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.json_schema import models_json_schema
+from typing_extensions import NotRequired, TypedDict
+from enum import Enum, IntEnum, IntFlag
+import orjson
+
+from response_cache import cached, invalidate
+
+# Cache TTLs (seconds) for read-only tools, by how often the data changes
+TTL_STATIC = 24 * 60 * 60      # product locations, supplier catalogs
+TTL_PROFILE = 60 * 60          # customer profiles, preferences, invoices
+TTL_ACTIVITY = 15 * 60         # order history, shipments
+TTL_REPORT = 5 * 60            # analytics and reports
+TTL_LIVE = 60                  # stock levels, order status
 
 
 # ============================================================================
@@ -17,63 +31,125 @@ class StockLevel(str, Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
-def check_stock(product_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_LIVE)
+def check_stock(product_id: str) -> Mapping[str, Any]:
     """Check current stock level for a product"""
     return {"status": "success", "product_id": product_id, "stock": 150}
 
+# Signed multiplier per inventory operation, so deltas are computed without branching
+_INVENTORY_OPERATION_SIGNS: Final = {"add": 1, "subtract": -1}
+
+def _operation_sign(operation: str) -> int:
+    """Sign of an inventory operation; single and batch updates reject the same unknown operations"""
+    sign = _INVENTORY_OPERATION_SIGNS.get(operation)
+    if sign is None:
+        raise ValueError(f"Unknown inventory operation: {operation!r}")
+    return sign
+
+_UPDATE_INVENTORY_RESPONSE: Final = {"status": "success", "product_id": None, "new_quantity": None, "quantity_change": None}
 def update_inventory(product_id: str, quantity: int, operation: str = "add") -> Dict[str, Any]:
     """Update inventory quantity for a product (add or subtract)"""
-    return {"status": "success", "product_id": product_id, "new_quantity": quantity}
-
+    quantity_change = _operation_sign(operation) * quantity
+    _invalidate_reads("update_inventory", product_id=[product_id])
+    response = _UPDATE_INVENTORY_RESPONSE.copy()
+    response["product_id"] = product_id
+    response["new_quantity"] = quantity
+    response["quantity_change"] = quantity_change
+    return response
+
+_REORDER_PRODUCT_RESPONSE: Final = {"status": "success", "order_id": "PO-12345", "quantity": None}
 def reorder_product(product_id: str, quantity: int, supplier_id: str) -> Dict[str, Any]:
     """Create a reorder request for a product from supplier"""
-    return {"status": "success", "order_id": "PO-12345", "quantity": quantity}
+    response = _REORDER_PRODUCT_RESPONSE.copy()
+    response["quantity"] = quantity
+    return response
 
-def track_shipment(shipment_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_ACTIVITY)
+def track_shipment(shipment_id: str) -> Mapping[str, Any]:
     """Track the status and location of a shipment"""
     return {"status": "in_transit", "location": "Distribution Center", "eta": "2 days"}
 
+_SET_LOW_STOCK_ALERT_RESPONSE: Final = {"status": "success", "alert_set": True, "threshold": None}
 def set_low_stock_alert(product_id: str, threshold: int) -> Dict[str, Any]:
     """Set automatic alert when product stock falls below threshold"""
-    return {"status": "success", "alert_set": True, "threshold": threshold}
+    response = _SET_LOW_STOCK_ALERT_RESPONSE.copy()
+    response["threshold"] = threshold
+    return response
 
-def get_inventory_report(category: Optional[str] = None, format: str = "json") -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_inventory_report(category: Optional[str] = None, format: str = "json") -> Mapping[str, Any]:
     """Generate inventory report for all products or specific category"""
     return {"status": "success", "total_items": 450, "report_format": format}
 
+_TRANSFER_STOCK_RESPONSE: Final = {"status": "success", "transfer_id": "TR-98765"}
 def transfer_stock(product_id: str, from_warehouse: str, to_warehouse: str, quantity: int) -> Dict[str, Any]:
     """Transfer stock between warehouses"""
-    return {"status": "success", "transfer_id": "TR-98765"}
+    _invalidate_reads("transfer_stock", product_id=[product_id])
+    return _TRANSFER_STOCK_RESPONSE.copy()
 
+_AUDIT_INVENTORY_RESPONSE: Final = {"status": "completed", "discrepancies": 3, "warehouse": None}
 def audit_inventory(warehouse_id: str) -> Dict[str, Any]:
     """Perform inventory audit for a warehouse"""
-    return {"status": "completed", "discrepancies": 3, "warehouse": warehouse_id}
+    response = _AUDIT_INVENTORY_RESPONSE.copy()
+    response["warehouse"] = warehouse_id
+    return response
 
+_RESERVE_INVENTORY_RESPONSE: Final = {"status": "reserved", "reservation_id": "RES-44556"}
 def reserve_inventory(product_id: str, quantity: int, order_id: str) -> Dict[str, Any]:
     """Reserve inventory for a pending order"""
-    return {"status": "reserved", "reservation_id": "RES-44556"}
+    _invalidate_reads("reserve_inventory", product_id=[product_id])
+    return _RESERVE_INVENTORY_RESPONSE.copy()
 
-def get_product_location(product_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_STATIC)
+def get_product_location(product_id: str) -> Mapping[str, Any]:
     """Get warehouse location and bin number for a product"""
     return {"warehouse": "WH-01", "aisle": "A", "bin": "15", "shelf": "3"}
 
-def batch_update_inventory(updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _coalesce_inventory_updates(updates: List["InventoryUpdate"]) -> Dict[str, int]:
+    """
+    Fold a batch of inventory updates into one signed delta per product.
+
+    This is the row set a real backend would apply in a single set-oriented
+    statement instead of one round-trip per update.
+    """
+    deltas: Dict[str, int] = {}
+    for update in updates:
+        product_id, quantity = update.get("product_id"), update.get("quantity")
+        if product_id is None or quantity is None:
+            raise ValueError(f"Inventory update needs product_id and quantity: {update!r}")
+        sign = _operation_sign(update.get("operation", "add"))
+        deltas[product_id] = deltas.get(product_id, 0) + sign * quantity
+    return deltas
+
+_BATCH_UPDATE_INVENTORY_RESPONSE: Final = {"status": "success", "updated_count": None, "quantity_changes": None}
+def batch_update_inventory(updates: List["InventoryUpdate"]) -> Dict[str, Any]:
     """Update inventory for multiple products in one batch"""
-    return {"status": "success", "updated_count": len(updates)}
-
-def predict_stockout(product_id: str, days: int = 30) -> Dict[str, Any]:
+    deltas = _coalesce_inventory_updates(updates)
+    _invalidate_reads("batch_update_inventory", product_id=deltas)
+    response = _BATCH_UPDATE_INVENTORY_RESPONSE.copy()
+    response["updated_count"] = len(updates)
+    response["quantity_changes"] = deltas
+    return response
+
+@cached(ttl=TTL_REPORT)
+def predict_stockout(product_id: str, days: int = 30) -> Mapping[str, Any]:
     """Predict if product will stock out in given days based on sales velocity"""
     return {"will_stockout": True, "estimated_days": 12, "recommendation": "reorder"}
 
-def get_supplier_inventory(supplier_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_STATIC)
+def get_supplier_inventory(supplier_id: str) -> Mapping[str, Any]:
     """Check available inventory from a supplier"""
     return {"supplier": supplier_id, "available_products": 245, "lead_time_days": 7}
 
+_SET_REORDER_POINT_RESPONSE: Final = {"status": "success", "reorder_level": None}
 def set_reorder_point(product_id: str, reorder_quantity: int, reorder_level: int) -> Dict[str, Any]:
     """Set automatic reorder point for a product"""
-    return {"status": "success", "reorder_level": reorder_level}
+    response = _SET_REORDER_POINT_RESPONSE.copy()
+    response["reorder_level"] = reorder_level
+    return response
 
-def get_dead_stock_report(days_threshold: int = 90) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_dead_stock_report(days_threshold: int = 90) -> Mapping[str, Any]:
     """Get report of products with no sales in specified days"""
     return {"status": "success", "dead_stock_items": 23, "total_value": 15000}
 
@@ -82,185 +158,287 @@ def get_dead_stock_report(days_threshold: int = 90) -> Dict[str, Any]:
 # CATEGORY 2: CUSTOMER OPERATIONS (15 tools)
 # ============================================================================
 
+_CREATE_CUSTOMER_RESPONSE: Final = {"status": "success", "customer_id": "CUST-78901", "email": None}
 def create_customer(name: str, email: str, phone: Optional[str] = None) -> Dict[str, Any]:
     """Create a new customer account"""
-    return {"status": "success", "customer_id": "CUST-78901", "email": email}
+    response = _CREATE_CUSTOMER_RESPONSE.copy()
+    response["email"] = email
+    return response
 
+_UPDATE_CUSTOMER_PROFILE_RESPONSE: Final = {"status": "success", "customer_id": None, "updated_field": None}
 def update_customer_profile(customer_id: str, field: str, value: str) -> Dict[str, Any]:
     """Update specific field in customer profile"""
-    return {"status": "success", "customer_id": customer_id, "updated_field": field}
-
-def get_customer_details(customer_id: str) -> Dict[str, Any]:
+    _invalidate_reads("update_customer_profile", customer_id=[customer_id])
+    response = _UPDATE_CUSTOMER_PROFILE_RESPONSE.copy()
+    response["customer_id"] = customer_id
+    response["updated_field"] = field
+    return response
+
+@cached(ttl=TTL_ACTIVITY)
+def get_customer_details(customer_id: str) -> Mapping[str, Any]:
     """Retrieve complete customer profile and history"""
     return {"customer_id": customer_id, "name": "John Doe", "total_orders": 15, "lifetime_value": 2500}
 
+_SEND_CUSTOMER_NOTIFICATION_RESPONSE: Final = {"status": "sent", "channel": None, "message_id": "MSG-55443"}
 def send_customer_notification(customer_id: str, message: str, channel: str = "email") -> Dict[str, Any]:
     """Send notification to customer via email, SMS, or push"""
-    return {"status": "sent", "channel": channel, "message_id": "MSG-55443"}
+    response = _SEND_CUSTOMER_NOTIFICATION_RESPONSE.copy()
+    response["channel"] = channel
+    return response
 
+_PROCESS_REFUND_RESPONSE: Final = {"status": "processed", "refund_id": "REF-99887", "amount": None}
 def process_refund(order_id: str, amount: float, reason: str) -> Dict[str, Any]:
     """Process refund for an order"""
-    return {"status": "processed", "refund_id": "REF-99887", "amount": amount}
+    response = _PROCESS_REFUND_RESPONSE.copy()
+    response["amount"] = amount
+    return response
 
+_ADD_CUSTOMER_NOTE_RESPONSE: Final = {"status": "success", "note_id": "NOTE-33221"}
 def add_customer_note(customer_id: str, note: str, category: str = "general") -> Dict[str, Any]:
     """Add internal note to customer profile"""
-    return {"status": "success", "note_id": "NOTE-33221"}
+    return _ADD_CUSTOMER_NOTE_RESPONSE.copy()
 
-def get_customer_order_history(customer_id: str, limit: int = 10) -> Dict[str, Any]:
+@cached(ttl=TTL_ACTIVITY)
+def get_customer_order_history(customer_id: str, limit: int = 10) -> Mapping[str, Any]:
     """Retrieve customer's order history"""
     return {"customer_id": customer_id, "orders": [], "total_orders": 15}
 
+_APPLY_CUSTOMER_DISCOUNT_RESPONSE: Final = {"status": "applied", "discount_percentage": 10, "valid_until": "2024-12-31"}
 def apply_customer_discount(customer_id: str, discount_code: str) -> Dict[str, Any]:
     """Apply discount code to customer account"""
-    return {"status": "applied", "discount_percentage": 10, "valid_until": "2024-12-31"}
+    return _APPLY_CUSTOMER_DISCOUNT_RESPONSE.copy()
 
+_UPDATE_CUSTOMER_TIER_RESPONSE: Final = {"status": "success", "new_tier": None, "benefits_unlocked": 5}
 def update_customer_tier(customer_id: str, new_tier: str) -> Dict[str, Any]:
     """Update customer loyalty tier (bronze, silver, gold, platinum)"""
-    return {"status": "success", "new_tier": new_tier, "benefits_unlocked": 5}
+    _invalidate_reads("update_customer_tier", customer_id=[customer_id])
+    response = _UPDATE_CUSTOMER_TIER_RESPONSE.copy()
+    response["new_tier"] = new_tier
+    return response
 
+_MERGE_CUSTOMER_ACCOUNTS_RESPONSE: Final = {"status": "merged", "primary_id": None, "orders_transferred": 8}
 def merge_customer_accounts(primary_id: str, secondary_id: str) -> Dict[str, Any]:
     """Merge duplicate customer accounts"""
-    return {"status": "merged", "primary_id": primary_id, "orders_transferred": 8}
+    _invalidate_reads("merge_customer_accounts", customer_id=[primary_id, secondary_id])
+    response = _MERGE_CUSTOMER_ACCOUNTS_RESPONSE.copy()
+    response["primary_id"] = primary_id
+    return response
 
-def get_customer_lifetime_value(customer_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_PROFILE)
+def get_customer_lifetime_value(customer_id: str) -> Mapping[str, Any]:
     """Calculate customer lifetime value and metrics"""
     return {"ltv": 2500, "avg_order_value": 166, "frequency": 15}
 
+_BLOCK_CUSTOMER_RESPONSE: Final = {"status": "blocked", "reason": None, "can_appeal": True}
 def block_customer(customer_id: str, reason: str) -> Dict[str, Any]:
     """Block customer account for fraud or policy violation"""
-    return {"status": "blocked", "reason": reason, "can_appeal": True}
+    _invalidate_reads("block_customer", customer_id=[customer_id])
+    response = _BLOCK_CUSTOMER_RESPONSE.copy()
+    response["reason"] = reason
+    return response
 
+_CREATE_CUSTOMER_SUPPORT_TICKET_RESPONSE: Final = {"status": "created", "ticket_id": "TICK-66554", "priority": None}
 def create_customer_support_ticket(customer_id: str, issue: str, priority: str = "medium") -> Dict[str, Any]:
     """Create support ticket for customer issue"""
-    return {"status": "created", "ticket_id": "TICK-66554", "priority": priority}
+    response = _CREATE_CUSTOMER_SUPPORT_TICKET_RESPONSE.copy()
+    response["priority"] = priority
+    return response
 
-def get_customer_preferences(customer_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_PROFILE)
+def get_customer_preferences(customer_id: str) -> Mapping[str, Any]:
     """Get customer communication and product preferences"""
     return {"email_subscribed": True, "sms_subscribed": False, "favorite_categories": ["electronics"]}
 
+_AWARD_LOYALTY_POINTS_RESPONSE: Final = {"status": "success", "total_points": 1500, "points_added": None}
 def award_loyalty_points(customer_id: str, points: int, reason: str) -> Dict[str, Any]:
     """Award loyalty points to customer"""
-    return {"status": "success", "total_points": 1500, "points_added": points}
+    response = _AWARD_LOYALTY_POINTS_RESPONSE.copy()
+    response["points_added"] = points
+    return response
 
 
 # ============================================================================
 # CATEGORY 3: ORDER PROCESSING (15 tools)
 # ============================================================================
 
-def create_order(customer_id: str, items: List[Dict[str, Any]], shipping_address: str) -> Dict[str, Any]:
+class OrderIssue(IntFlag):
+    """Order validation failures, OR-ed together into an `issues_mask`"""
+    NONE = 0
+    INSUFFICIENT_INVENTORY = 1
+    INVALID_ADDRESS = 2
+    PAYMENT_FAILED = 4
+
+def _issue_names(issues_mask: OrderIssue) -> List[str]:
+    """Names of the failures set in a mask, e.g. ["invalid_address"]"""
+    return [issue.name.lower() for issue in OrderIssue if issue and issue in issues_mask]
+
+_CREATE_ORDER_RESPONSE: Final = {"status": "success", "order_id": "ORD-11223", "total": 299.99}
+def create_order(customer_id: str, items: List["OrderItem"], shipping_address: str) -> Dict[str, Any]:
     """Create a new order for a customer"""
-    return {"status": "success", "order_id": "ORD-11223", "total": 299.99}
+    _invalidate_reads("create_order", customer_id=[customer_id])
+    return _CREATE_ORDER_RESPONSE.copy()
 
+_CANCEL_ORDER_RESPONSE: Final = {"status": "cancelled", "order_id": None, "refund_initiated": True}
 def cancel_order(order_id: str, reason: str) -> Dict[str, Any]:
     """Cancel an existing order"""
-    return {"status": "cancelled", "order_id": order_id, "refund_initiated": True}
+    _invalidate_reads("cancel_order", order_id=[order_id])
+    response = _CANCEL_ORDER_RESPONSE.copy()
+    response["order_id"] = order_id
+    return response
 
-def get_order_status(order_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_LIVE)
+def get_order_status(order_id: str) -> Mapping[str, Any]:
     """Get current status of an order"""
     return {"order_id": order_id, "status": "shipped", "tracking_number": "TRK-998877"}
 
+_UPDATE_ORDER_STATUS_RESPONSE: Final = {"status": "success", "order_id": None, "new_status": None}
 def update_order_status(order_id: str, new_status: str) -> Dict[str, Any]:
     """Update order status (pending, processing, shipped, delivered)"""
-    return {"status": "success", "order_id": order_id, "new_status": new_status}
-
-def calculate_shipping_cost(order_id: str, shipping_method: str, destination: str) -> Dict[str, Any]:
+    _invalidate_reads("update_order_status", order_id=[order_id])
+    response = _UPDATE_ORDER_STATUS_RESPONSE.copy()
+    response["order_id"] = order_id
+    response["new_status"] = new_status
+    return response
+
+@cached(ttl=TTL_PROFILE)
+def calculate_shipping_cost(order_id: str, shipping_method: str, destination: str) -> Mapping[str, Any]:
     """Calculate shipping cost for an order"""
     return {"shipping_cost": 15.99, "method": shipping_method, "estimated_days": 3}
 
+_APPLY_DISCOUNT_CODE_RESPONSE: Final = {"status": "applied", "discount_amount": 25.00, "new_total": 274.99}
 def apply_discount_code(order_id: str, discount_code: str) -> Dict[str, Any]:
     """Apply discount code to an order"""
-    return {"status": "applied", "discount_amount": 25.00, "new_total": 274.99}
+    return _APPLY_DISCOUNT_CODE_RESPONSE.copy()
 
+_SPLIT_ORDER_RESPONSE: Final = {"status": "split", "new_order_ids": None}
 def split_order(order_id: str, item_groups: List[List[str]]) -> Dict[str, Any]:
     """Split order into multiple shipments"""
-    return {"status": "split", "new_order_ids": ["ORD-11223-A", "ORD-11223-B"]}
+    response = _SPLIT_ORDER_RESPONSE.copy()
+    response["new_order_ids"] = ["ORD-11223-A", "ORD-11223-B"]
+    return response
 
+_PROCESS_PAYMENT_RESPONSE: Final = {"status": "success", "transaction_id": "TXN-77665", "amount": None}
 def process_payment(order_id: str, payment_method: str, amount: float) -> Dict[str, Any]:
     """Process payment for an order"""
-    return {"status": "success", "transaction_id": "TXN-77665", "amount": amount}
+    response = _PROCESS_PAYMENT_RESPONSE.copy()
+    response["amount"] = amount
+    return response
 
-def validate_order(order_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_LIVE)
+def validate_order(order_id: str) -> Mapping[str, Any]:
     """Validate order details (inventory, address, payment)"""
-    return {"valid": True, "issues": [], "ready_to_ship": True}
+    issues_mask = OrderIssue.NONE
+    return {"valid": issues_mask == 0, "issues": _issue_names(issues_mask),
+            "issues_mask": int(issues_mask), "ready_to_ship": True}
 
-def get_order_invoice(order_id: str, format: str = "pdf") -> Dict[str, Any]:
+@cached(ttl=TTL_PROFILE)
+def get_order_invoice(order_id: str, format: str = "pdf") -> Mapping[str, Any]:
     """Generate and retrieve order invoice"""
     return {"status": "success", "invoice_url": "https://invoices.example.com/inv-123", "format": format}
 
-def add_items_to_order(order_id: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+_ADD_ITEMS_TO_ORDER_RESPONSE: Final = {"status": "success", "items_added": None, "new_total": 349.99}
+def add_items_to_order(order_id: str, items: List["OrderItem"]) -> Dict[str, Any]:
     """Add additional items to existing order"""
-    return {"status": "success", "items_added": len(items), "new_total": 349.99}
+    response = _ADD_ITEMS_TO_ORDER_RESPONSE.copy()
+    response["items_added"] = len(items)
+    return response
 
+_REMOVE_ITEMS_FROM_ORDER_RESPONSE: Final = {"status": "success", "items_removed": None, "new_total": 249.99}
 def remove_items_from_order(order_id: str, item_ids: List[str]) -> Dict[str, Any]:
     """Remove items from existing order"""
-    return {"status": "success", "items_removed": len(item_ids), "new_total": 249.99}
+    response = _REMOVE_ITEMS_FROM_ORDER_RESPONSE.copy()
+    response["items_removed"] = len(item_ids)
+    return response
 
+_UPDATE_SHIPPING_ADDRESS_RESPONSE: Final = {"status": "success", "order_id": None, "address_updated": True}
 def update_shipping_address(order_id: str, new_address: str) -> Dict[str, Any]:
     """Update shipping address for an order"""
-    return {"status": "success", "order_id": order_id, "address_updated": True}
+    _invalidate_reads("update_shipping_address", order_id=[order_id])
+    response = _UPDATE_SHIPPING_ADDRESS_RESPONSE.copy()
+    response["order_id"] = order_id
+    return response
 
+_RESCHEDULE_DELIVERY_RESPONSE: Final = {"status": "rescheduled", "new_delivery_date": None}
 def reschedule_delivery(order_id: str, new_date: str) -> Dict[str, Any]:
     """Reschedule delivery date for an order"""
-    return {"status": "rescheduled", "new_delivery_date": new_date}
+    response = _RESCHEDULE_DELIVERY_RESPONSE.copy()
+    response["new_delivery_date"] = new_date
+    return response
 
+_MARK_ORDER_AS_GIFT_RESPONSE: Final = {"status": "success", "gift_wrap_added": True, "gift_message": None}
 def mark_order_as_gift(order_id: str, gift_message: Optional[str] = None) -> Dict[str, Any]:
     """Mark order as gift with optional message"""
-    return {"status": "success", "gift_wrap_added": True, "gift_message": gift_message}
+    response = _MARK_ORDER_AS_GIFT_RESPONSE.copy()
+    response["gift_message"] = gift_message
+    return response
 
 
 # ============================================================================
 # CATEGORY 4: ANALYTICS & REPORTING (13 tools)
 # ============================================================================
 
-def generate_sales_report(start_date: str, end_date: str, granularity: str = "daily") -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def generate_sales_report(start_date: str, end_date: str, granularity: str = "daily") -> Mapping[str, Any]:
     """Generate sales report for date range"""
     return {"status": "success", "total_sales": 125000, "orders": 450, "avg_order_value": 278}
 
-def get_customer_analytics(metric: str, time_period: str = "30d") -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_customer_analytics(metric: str, time_period: str = "30d") -> Mapping[str, Any]:
     """Get customer analytics (acquisition, retention, churn)"""
     return {"metric": metric, "value": 245, "change_percentage": 12.5}
 
-def forecast_inventory_demand(product_id: str, days: int = 30) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def forecast_inventory_demand(product_id: str, days: int = 30) -> Mapping[str, Any]:
     """Forecast product demand for future period"""
     return {"product_id": product_id, "predicted_demand": 450, "confidence": 0.85}
 
-def generate_revenue_dashboard(date: str) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def generate_revenue_dashboard(date: str) -> Mapping[str, Any]:
     """Generate comprehensive revenue dashboard"""
     return {"total_revenue": 15000, "orders": 75, "avg_cart_value": 200, "top_products": []}
 
-def get_product_performance(product_id: str, days: int = 30) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_product_performance(product_id: str, days: int = 30) -> Mapping[str, Any]:
     """Get product performance metrics"""
     return {"units_sold": 120, "revenue": 5400, "return_rate": 2.5, "avg_rating": 4.5}
 
-def analyze_cart_abandonment(time_period: str = "7d") -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def analyze_cart_abandonment(time_period: str = "7d") -> Mapping[str, Any]:
     """Analyze cart abandonment rate and reasons"""
     return {"abandonment_rate": 68.5, "total_carts": 230, "completed": 72}
 
-def get_top_selling_products(category: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_top_selling_products(category: Optional[str] = None, limit: int = 10) -> Mapping[str, Any]:
     """Get top selling products overall or by category"""
     return {"status": "success", "products": [], "time_period": "30d"}
 
-def calculate_profit_margin(product_id: Optional[str] = None, category: Optional[str] = None) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def calculate_profit_margin(product_id: Optional[str] = None, category: Optional[str] = None) -> Mapping[str, Any]:
     """Calculate profit margin for product or category"""
     return {"margin_percentage": 35.5, "gross_profit": 15000, "revenue": 42000}
 
-def get_customer_segmentation_report() -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_customer_segmentation_report() -> Mapping[str, Any]:
     """Get customer segmentation analysis (RFM, behavioral)"""
     return {"segments": {"high_value": 120, "at_risk": 45, "new": 200}}
 
-def analyze_return_rate(time_period: str = "30d", category: Optional[str] = None) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def analyze_return_rate(time_period: str = "30d", category: Optional[str] = None) -> Mapping[str, Any]:
     """Analyze product return rate and reasons"""
     return {"return_rate": 3.2, "total_returns": 24, "top_reasons": ["size", "defect"]}
 
-def get_conversion_funnel(start_date: str, end_date: str) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_conversion_funnel(start_date: str, end_date: str) -> Mapping[str, Any]:
     """Get conversion funnel analytics"""
     return {"visits": 10000, "carts": 2000, "checkouts": 800, "purchases": 600}
 
-def compare_period_performance(period1: str, period2: str, metric: str) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def compare_period_performance(period1: str, period2: str, metric: str) -> Mapping[str, Any]:
     """Compare performance metrics between two time periods"""
     return {"period1_value": 15000, "period2_value": 18000, "change_percentage": 20}
 
-def get_channel_attribution_report(order_id: Optional[str] = None) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def get_channel_attribution_report(order_id: Optional[str] = None) -> Mapping[str, Any]:
     """Get marketing channel attribution for sales"""
     return {"channels": {"organic": 40, "paid": 35, "email": 15, "social": 10}}
 
@@ -269,53 +447,126 @@ def get_channel_attribution_report(order_id: Optional[str] = None) -> Dict[str,
 # CATEGORY 5: MARKETING & CONTENT (12 tools)
 # ============================================================================
 
+_CREATE_MARKETING_CAMPAIGN_RESPONSE: Final = {"status": "created", "campaign_id": "CAMP-55443", "budget": None}
 def create_marketing_campaign(name: str, channel: str, budget: float, duration_days: int) -> Dict[str, Any]:
     """Create new marketing campaign"""
-    return {"status": "created", "campaign_id": "CAMP-55443", "budget": budget}
+    response = _CREATE_MARKETING_CAMPAIGN_RESPONSE.copy()
+    response["budget"] = budget
+    return response
 
+_SEND_EMAIL_BLAST_RESPONSE: Final = {"status": "scheduled", "recipients": 1500, "send_time": "2024-01-30 10:00"}
 def send_email_blast(segment: str, subject: str, template_id: str) -> Dict[str, Any]:
     """Send bulk email to customer segment"""
-    return {"status": "scheduled", "recipients": 1500, "send_time": "2024-01-30 10:00"}
+    return _SEND_EMAIL_BLAST_RESPONSE.copy()
 
+_UPDATE_PRODUCT_DESCRIPTION_RESPONSE: Final = {"status": "success", "product_id": None, "updated": True}
 def update_product_description(product_id: str, description: str) -> Dict[str, Any]:
     """Update product description and details"""
-    return {"status": "success", "product_id": product_id, "updated": True}
+    response = _UPDATE_PRODUCT_DESCRIPTION_RESPONSE.copy()
+    response["product_id"] = product_id
+    return response
 
+_SCHEDULE_SOCIAL_POST_RESPONSE: Final = {"status": "scheduled", "platform": None, "post_id": "POST-88776"}
 def schedule_social_post(platform: str, content: str, scheduled_time: str) -> Dict[str, Any]:
     """Schedule social media post"""
-    return {"status": "scheduled", "platform": platform, "post_id": "POST-88776"}
+    response = _SCHEDULE_SOCIAL_POST_RESPONSE.copy()
+    response["platform"] = platform
+    return response
 
+_CREATE_DISCOUNT_CAMPAIGN_RESPONSE: Final = {"status": "created", "code": None, "discount": None}
 def create_discount_campaign(code: str, percentage: float, valid_until: str, conditions: Dict[str, Any]) -> Dict[str, Any]:
     """Create discount code campaign"""
-    return {"status": "created", "code": code, "discount": percentage}
+    response = _CREATE_DISCOUNT_CAMPAIGN_RESPONSE.copy()
+    response["code"] = code
+    response["discount"] = percentage
+    return response
 
-def analyze_campaign_performance(campaign_id: str) -> Dict[str, Any]:
+@cached(ttl=TTL_REPORT)
+def analyze_campaign_performance(campaign_id: str) -> Mapping[str, Any]:
     """Get campaign performance metrics"""
     return {"clicks": 2500, "conversions": 125, "roi": 3.5, "cost_per_acquisition": 25}
 
+_CREATE_PRODUCT_BUNDLE_RESPONSE: Final = {"status": "created", "bundle_id": "BNDL-33221", "products": None}
 def create_product_bundle(name: str, product_ids: List[str], discount: float) -> Dict[str, Any]:
     """Create product bundle with discount"""
-    return {"status": "created", "bundle_id": "BNDL-33221", "products": len(product_ids)}
+    response = _CREATE_PRODUCT_BUNDLE_RESPONSE.copy()
+    response["products"] = len(product_ids)
+    return response
 
+_UPDATE_PRICING_RESPONSE: Final = {"status": "success", "product_id": None, "new_price": None}
 def update_pricing(product_id: str, new_price: float, sale_price: Optional[float] = None) -> Dict[str, Any]:
     """Update product pricing"""
-    return {"status": "success", "product_id": product_id, "new_price": new_price}
+    response = _UPDATE_PRICING_RESPONSE.copy()
+    response["product_id"] = product_id
+    response["new_price"] = new_price
+    return response
 
+_CREATE_ABANDONED_CART_CAMPAIGN_RESPONSE: Final = {"status": "active", "target_carts": 150, "estimated_recovery": "15%"}
 def create_abandoned_cart_campaign(hours_threshold: int = 24) -> Dict[str, Any]:
     """Create automated abandoned cart recovery campaign"""
-    return {"status": "active", "target_carts": 150, "estimated_recovery": "15%"}
+    return _CREATE_ABANDONED_CART_CAMPAIGN_RESPONSE.copy()
 
-def generate_product_recommendations(customer_id: str, limit: int = 5) -> Dict[str, Any]:
+@cached(ttl=TTL_PROFILE)
+def generate_product_recommendations(customer_id: str, limit: int = 5) -> Mapping[str, Any]:
     """Generate personalized product recommendations"""
     return {"customer_id": customer_id, "recommendations": [], "algorithm": "collaborative_filtering"}
 
+_UPDATE_SEO_METADATA_RESPONSE: Final = {"status": "success", "product_id": None, "indexed": True}
 def update_seo_metadata(product_id: str, title: str, keywords: List[str], description: str) -> Dict[str, Any]:
     """Update product SEO metadata"""
-    return {"status": "success", "product_id": product_id, "indexed": True}
+    response = _UPDATE_SEO_METADATA_RESPONSE.copy()
+    response["product_id"] = product_id
+    return response
 
+_CREATE_LOYALTY_PROGRAM_TIER_RESPONSE: Final = {"status": "created", "tier": None, "min_spend": None}
 def create_loyalty_program_tier(tier_name: str, min_spend: float, benefits: List[str]) -> Dict[str, Any]:
     """Create or update loyalty program tier"""
-    return {"status": "created", "tier": tier_name, "min_spend": min_spend}
+    response = _CREATE_LOYALTY_PROGRAM_TIER_RESPONSE.copy()
+    response["tier"] = tier_name
+    response["min_spend"] = min_spend
+    return response
+
+
+# ============================================================================
+# CACHE INVALIDATION - Cached reads each write tool makes stale
+# ============================================================================
+
+# write tool -> (read tool, identifier argument) pairs. With an argument, only
+# the reads for the ids the write touched are dropped; None drops every cached
+# response of the read (reads keyed by more than that id, or not by it at all)
+WRITE_INVALIDATIONS: Final = MappingProxyType({
+    "update_inventory": ((check_stock, "product_id"), (predict_stockout, None), (get_inventory_report, None)),
+    "batch_update_inventory": ((check_stock, "product_id"), (predict_stockout, None), (get_inventory_report, None)),
+    "transfer_stock": ((check_stock, "product_id"), (get_product_location, "product_id")),
+    "reserve_inventory": ((check_stock, "product_id"), (predict_stockout, None)),
+    "update_customer_profile": ((get_customer_details, "customer_id"), (get_customer_preferences, "customer_id")),
+    "update_customer_tier": ((get_customer_details, "customer_id"),),
+    "block_customer": ((get_customer_details, "customer_id"),),
+    "merge_customer_accounts": (
+        (get_customer_details, "customer_id"), (get_customer_lifetime_value, "customer_id"),
+        (get_customer_order_history, None)),
+    "create_order": ((get_customer_details, "customer_id"), (get_customer_order_history, None)),
+    "cancel_order": ((get_order_status, "order_id"), (validate_order, "order_id")),
+    "update_order_status": ((get_order_status, "order_id"), (validate_order, "order_id")),
+    # The order's customer is not known here, so all customer details are dropped
+    "update_shipping_address": (
+        (validate_order, "order_id"), (calculate_shipping_cost, None), (get_customer_details, None)),
+})
+
+def _invalidate_reads(write_tool: str, **ids: Iterable[str]):
+    """
+    Drop the cached reads listed for a write tool in WRITE_INVALIDATIONS.
+
+    Args:
+        write_tool: Name of the write tool that ran
+        **ids: Identifier argument name -> ids the write touched
+    """
+    for read_tool, argument in WRITE_INVALIDATIONS[write_tool]:
+        if argument is None:
+            invalidate(read_tool)
+        else:
+            for value in ids[argument]:
+                invalidate(read_tool, **{argument: value})
 
 
 # ============================================================================
@@ -324,298 +575,335 @@ def create_loyalty_program_tier(tier_name: str, min_spend: float, benefits: List
 
 # We'll create Pydantic models for each tool's parameters
 # This allows automatic conversion to JSON schema for LLM function calling
+# The same models validate tool-call arguments in compiled pydantic-core, so
+# schema generation and validation share a single source of truth
+
+class _ToolInput(BaseModel):
+    """
+    Base for tool argument models: immutable, and unknown arguments are rejected.
+
+    Validators are built on first use rather than at import, since a session
+    usually calls only a handful of the 70 tools.
+    """
+    model_config = ConfigDict(frozen=True, extra="forbid", defer_build=True)
+
+# Descriptions for self-explanatory fields declared without Field(); they are
+# added to the tool schemas (including nested item schemas) when those are emitted
+FIELD_DESCRIPTIONS: Final = {
+    "product_id": "Unique identifier for the product",
+    "order_id": "Order identifier",
+    "customer_id": "Customer identifier",
+    "supplier_id": "Supplier identifier",
+    "shipment_id": "Shipment tracking identifier",
+    "warehouse_id": "Warehouse identifier to audit",
+    "template_id": "Email template identifier",
+    "campaign_id": "Campaign identifier",
+}
+
+# Typed shapes for list arguments, so each item is validated against a fixed
+# schema instead of as an arbitrary dict (typing_extensions.TypedDict, which
+# pydantic requires before Python 3.12, keeps the items plain dicts)
+class InventoryUpdate(TypedDict):
+    product_id: str
+    quantity: Annotated[int, Field(description="Quantity to add or subtract")]
+    operation: NotRequired[Annotated[Literal["add", "subtract"], Field(description="Operation type: 'add' or 'subtract' (default 'add')")]]
+
+class OrderItem(TypedDict):
+    product_id: str
+    quantity: Annotated[int, Field(description="Quantity ordered")]
+
 
-class CheckStockInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class CheckStockInput(_ToolInput):
+    product_id: str
 
-class UpdateInventoryInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class UpdateInventoryInput(_ToolInput):
+    product_id: str
     quantity: int = Field(description="Quantity to add or subtract")
-    operation: str = Field(default="add", description="Operation type: 'add' or 'subtract'")
+    operation: Literal["add", "subtract"] = Field(default="add", description="Operation type: 'add' or 'subtract'")
 
-class ReorderProductInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class ReorderProductInput(_ToolInput):
+    product_id: str
     quantity: int = Field(description="Quantity to reorder")
-    supplier_id: str = Field(description="Supplier identifier")
+    supplier_id: str
 
-class TrackShipmentInput(BaseModel):
-    shipment_id: str = Field(description="Shipment tracking identifier")
+class TrackShipmentInput(_ToolInput):
+    shipment_id: str
 
-class SetLowStockAlertInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class SetLowStockAlertInput(_ToolInput):
+    product_id: str
     threshold: int = Field(description="Minimum quantity threshold for alert")
 
-class GetInventoryReportInput(BaseModel):
+class GetInventoryReportInput(_ToolInput):
     category: Optional[str] = Field(default=None, description="Product category to filter by")
-    format: str = Field(default="json", description="Report format: json, csv, or pdf")
+    format: Literal["json", "csv", "pdf"] = Field(default="json", description="Report format: json, csv, or pdf")
 
-class TransferStockInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class TransferStockInput(_ToolInput):
+    product_id: str
     from_warehouse: str = Field(description="Source warehouse ID")
     to_warehouse: str = Field(description="Destination warehouse ID")
     quantity: int = Field(description="Quantity to transfer")
 
-class AuditInventoryInput(BaseModel):
-    warehouse_id: str = Field(description="Warehouse identifier to audit")
+class AuditInventoryInput(_ToolInput):
+    warehouse_id: str
 
-class ReserveInventoryInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class ReserveInventoryInput(_ToolInput):
+    product_id: str
     quantity: int = Field(description="Quantity to reserve")
     order_id: str = Field(description="Order ID for reservation")
 
-class GetProductLocationInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class GetProductLocationInput(_ToolInput):
+    product_id: str
 
-class BatchUpdateInventoryInput(BaseModel):
-    updates: List[Dict[str, Any]] = Field(description="List of inventory updates")
+class BatchUpdateInventoryInput(_ToolInput):
+    updates: List[InventoryUpdate] = Field(description="List of inventory updates")
 
-class PredictStockoutInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class PredictStockoutInput(_ToolInput):
+    product_id: str
     days: int = Field(default=30, description="Number of days to predict")
 
-class GetSupplierInventoryInput(BaseModel):
-    supplier_id: str = Field(description="Supplier identifier")
+class GetSupplierInventoryInput(_ToolInput):
+    supplier_id: str
 
-class SetReorderPointInput(BaseModel):
-    product_id: str = Field(description="Unique identifier for the product")
+class SetReorderPointInput(_ToolInput):
+    product_id: str
     reorder_quantity: int = Field(description="Quantity to order when reorder point is reached")
     reorder_level: int = Field(description="Stock level that triggers reorder")
 
-class GetDeadStockReportInput(BaseModel):
+class GetDeadStockReportInput(_ToolInput):
     days_threshold: int = Field(default=90, description="Days without sales to consider dead stock")
 
 # Customer Operations Schemas
-class CreateCustomerInput(BaseModel):
+class CreateCustomerInput(_ToolInput):
     name: str = Field(description="Customer full name")
     email: str = Field(description="Customer email address")
     phone: Optional[str] = Field(default=None, description="Customer phone number")
 
-class UpdateCustomerProfileInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class UpdateCustomerProfileInput(_ToolInput):
+    customer_id: str
     field: str = Field(description="Field name to update")
     value: str = Field(description="New value for the field")
 
-class GetCustomerDetailsInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class GetCustomerDetailsInput(_ToolInput):
+    customer_id: str
 
-class SendCustomerNotificationInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class SendCustomerNotificationInput(_ToolInput):
+    customer_id: str
     message: str = Field(description="Notification message")
-    channel: str = Field(default="email", description="Communication channel: email, sms, or push")
+    channel: Literal["email", "sms", "push"] = Field(default="email", description="Communication channel: email, sms, or push")
 
-class ProcessRefundInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class ProcessRefundInput(_ToolInput):
+    order_id: str
     amount: float = Field(description="Refund amount")
     reason: str = Field(description="Reason for refund")
 
-class AddCustomerNoteInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class AddCustomerNoteInput(_ToolInput):
+    customer_id: str
     note: str = Field(description="Note content")
     category: str = Field(default="general", description="Note category")
 
-class GetCustomerOrderHistoryInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class GetCustomerOrderHistoryInput(_ToolInput):
+    customer_id: str
     limit: int = Field(default=10, description="Maximum number of orders to return")
 
-class ApplyCustomerDiscountInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class ApplyCustomerDiscountInput(_ToolInput):
+    customer_id: str
     discount_code: str = Field(description="Discount code to apply")
 
-class UpdateCustomerTierInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
-    new_tier: str = Field(description="New loyalty tier: bronze, silver, gold, or platinum")
+class UpdateCustomerTierInput(_ToolInput):
+    customer_id: str
+    new_tier: Literal["bronze", "silver", "gold", "platinum"] = Field(description="New loyalty tier: bronze, silver, gold, or platinum")
 
-class MergeCustomerAccountsInput(BaseModel):
+class MergeCustomerAccountsInput(_ToolInput):
     primary_id: str = Field(description="Primary customer account ID to keep")
     secondary_id: str = Field(description="Secondary customer account ID to merge")
 
-class GetCustomerLifetimeValueInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class GetCustomerLifetimeValueInput(_ToolInput):
+    customer_id: str
 
-class BlockCustomerInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class BlockCustomerInput(_ToolInput):
+    customer_id: str
     reason: str = Field(description="Reason for blocking")
 
-class CreateCustomerSupportTicketInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class CreateCustomerSupportTicketInput(_ToolInput):
+    customer_id: str
     issue: str = Field(description="Issue description")
-    priority: str = Field(default="medium", description="Ticket priority: low, medium, or high")
+    priority: Literal["low", "medium", "high"] = Field(default="medium", description="Ticket priority: low, medium, or high")
 
-class GetCustomerPreferencesInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class GetCustomerPreferencesInput(_ToolInput):
+    customer_id: str
 
-class AwardLoyaltyPointsInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class AwardLoyaltyPointsInput(_ToolInput):
+    customer_id: str
     points: int = Field(description="Points to award")
     reason: str = Field(description="Reason for awarding points")
 
 # Order Processing Schemas
-class CreateOrderInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
-    items: List[Dict[str, Any]] = Field(description="List of items in order")
+class CreateOrderInput(_ToolInput):
+    customer_id: str
+    items: List[OrderItem] = Field(description="List of items in order")
     shipping_address: str = Field(description="Shipping address")
 
-class CancelOrderInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class CancelOrderInput(_ToolInput):
+    order_id: str
     reason: str = Field(description="Cancellation reason")
 
-class GetOrderStatusInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class GetOrderStatusInput(_ToolInput):
+    order_id: str
 
-class UpdateOrderStatusInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
-    new_status: str = Field(description="New order status")
+class UpdateOrderStatusInput(_ToolInput):
+    order_id: str
+    new_status: Literal["pending", "processing", "shipped", "delivered"] = Field(description="New order status")
 
-class CalculateShippingCostInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
-    shipping_method: str = Field(description="Shipping method: standard, express, or overnight")
+class CalculateShippingCostInput(_ToolInput):
+    order_id: str
+    shipping_method: Literal["standard", "express", "overnight"] = Field(description="Shipping method: standard, express, or overnight")
     destination: str = Field(description="Destination address or zip code")
 
-class ApplyDiscountCodeInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class ApplyDiscountCodeInput(_ToolInput):
+    order_id: str
     discount_code: str = Field(description="Discount code to apply")
 
-class SplitOrderInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class SplitOrderInput(_ToolInput):
+    order_id: str
     item_groups: List[List[str]] = Field(description="Groups of items for separate shipments")
 
-class ProcessPaymentInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class ProcessPaymentInput(_ToolInput):
+    order_id: str
     payment_method: str = Field(description="Payment method: card, paypal, etc.")
     amount: float = Field(description="Payment amount")
 
-class ValidateOrderInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class ValidateOrderInput(_ToolInput):
+    order_id: str
 
-class GetOrderInvoiceInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
-    format: str = Field(default="pdf", description="Invoice format: pdf or html")
+class GetOrderInvoiceInput(_ToolInput):
+    order_id: str
+    format: Literal["pdf", "html"] = Field(default="pdf", description="Invoice format: pdf or html")
 
-class AddItemsToOrderInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
-    items: List[Dict[str, Any]] = Field(description="Items to add")
+class AddItemsToOrderInput(_ToolInput):
+    order_id: str
+    items: List[OrderItem] = Field(description="Items to add")
 
-class RemoveItemsFromOrderInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class RemoveItemsFromOrderInput(_ToolInput):
+    order_id: str
     item_ids: List[str] = Field(description="Item IDs to remove")
 
-class UpdateShippingAddressInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class UpdateShippingAddressInput(_ToolInput):
+    order_id: str
     new_address: str = Field(description="New shipping address")
 
-class RescheduleDeliveryInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class RescheduleDeliveryInput(_ToolInput):
+    order_id: str
     new_date: str = Field(description="New delivery date (YYYY-MM-DD)")
 
-class MarkOrderAsGiftInput(BaseModel):
-    order_id: str = Field(description="Order identifier")
+class MarkOrderAsGiftInput(_ToolInput):
+    order_id: str
     gift_message: Optional[str] = Field(default=None, description="Optional gift message")
 
 # Analytics & Reporting Schemas
-class GenerateSalesReportInput(BaseModel):
+class GenerateSalesReportInput(_ToolInput):
     start_date: str = Field(description="Report start date (YYYY-MM-DD)")
     end_date: str = Field(description="Report end date (YYYY-MM-DD)")
-    granularity: str = Field(default="daily", description="Data granularity: hourly, daily, weekly, or monthly")
+    granularity: Literal["hourly", "daily", "weekly", "monthly"] = Field(default="daily", description="Data granularity: hourly, daily, weekly, or monthly")
 
-class GetCustomerAnalyticsInput(BaseModel):
-    metric: str = Field(description="Metric to analyze: acquisition, retention, or churn")
+class GetCustomerAnalyticsInput(_ToolInput):
+    metric: Literal["acquisition", "retention", "churn"] = Field(description="Metric to analyze: acquisition, retention, or churn")
     time_period: str = Field(default="30d", description="Time period: 7d, 30d, 90d, etc.")
 
-class ForecastInventoryDemandInput(BaseModel):
+class ForecastInventoryDemandInput(_ToolInput):
     product_id: str = Field(description="Product identifier")
     days: int = Field(default=30, description="Days to forecast")
 
-class GenerateRevenueDashboardInput(BaseModel):
+class GenerateRevenueDashboardInput(_ToolInput):
     date: str = Field(description="Dashboard date (YYYY-MM-DD)")
 
-class GetProductPerformanceInput(BaseModel):
+class GetProductPerformanceInput(_ToolInput):
     product_id: str = Field(description="Product identifier")
     days: int = Field(default=30, description="Number of days to analyze")
 
-class AnalyzeCartAbandonmentInput(BaseModel):
+class AnalyzeCartAbandonmentInput(_ToolInput):
     time_period: str = Field(default="7d", description="Time period to analyze")
 
-class GetTopSellingProductsInput(BaseModel):
+class GetTopSellingProductsInput(_ToolInput):
     category: Optional[str] = Field(default=None, description="Product category filter")
     limit: int = Field(default=10, description="Number of products to return")
 
-class CalculateProfitMarginInput(BaseModel):
+class CalculateProfitMarginInput(_ToolInput):
     product_id: Optional[str] = Field(default=None, description="Specific product ID")
     category: Optional[str] = Field(default=None, description="Product category")
 
-class GetCustomerSegmentationReportInput(BaseModel):
+class GetCustomerSegmentationReportInput(_ToolInput):
     pass  # No parameters needed
 
-class AnalyzeReturnRateInput(BaseModel):
+class AnalyzeReturnRateInput(_ToolInput):
     time_period: str = Field(default="30d", description="Time period to analyze")
     category: Optional[str] = Field(default=None, description="Product category filter")
 
-class GetConversionFunnelInput(BaseModel):
+class GetConversionFunnelInput(_ToolInput):
     start_date: str = Field(description="Start date (YYYY-MM-DD)")
     end_date: str = Field(description="End date (YYYY-MM-DD)")
 
-class ComparePeriodPerformanceInput(BaseModel):
+class ComparePeriodPerformanceInput(_ToolInput):
     period1: str = Field(description="First period (e.g., '2024-01' or '2024-01-01:2024-01-31')")
     period2: str = Field(description="Second period to compare")
     metric: str = Field(description="Metric to compare: sales, orders, revenue, etc.")
 
-class GetChannelAttributionReportInput(BaseModel):
+class GetChannelAttributionReportInput(_ToolInput):
     order_id: Optional[str] = Field(default=None, description="Specific order ID to analyze")
 
 # Marketing & Content Schemas
-class CreateMarketingCampaignInput(BaseModel):
+class CreateMarketingCampaignInput(_ToolInput):
     name: str = Field(description="Campaign name")
     channel: str = Field(description="Marketing channel: email, social, paid_search, etc.")
     budget: float = Field(description="Campaign budget")
     duration_days: int = Field(description="Campaign duration in days")
 
-class SendEmailBlastInput(BaseModel):
+class SendEmailBlastInput(_ToolInput):
     segment: str = Field(description="Customer segment to target")
     subject: str = Field(description="Email subject line")
-    template_id: str = Field(description="Email template identifier")
+    template_id: str
 
-class UpdateProductDescriptionInput(BaseModel):
+class UpdateProductDescriptionInput(_ToolInput):
     product_id: str = Field(description="Product identifier")
     description: str = Field(description="New product description")
 
-class ScheduleSocialPostInput(BaseModel):
+class ScheduleSocialPostInput(_ToolInput):
     platform: str = Field(description="Social platform: facebook, twitter, instagram, etc.")
     content: str = Field(description="Post content")
     scheduled_time: str = Field(description="Scheduled post time (ISO format)")
 
-class CreateDiscountCampaignInput(BaseModel):
+class CreateDiscountCampaignInput(_ToolInput):
     code: str = Field(description="Discount code")
     percentage: float = Field(description="Discount percentage")
     valid_until: str = Field(description="Expiration date (YYYY-MM-DD)")
     conditions: Dict[str, Any] = Field(description="Discount conditions and rules")
 
-class AnalyzeCampaignPerformanceInput(BaseModel):
-    campaign_id: str = Field(description="Campaign identifier")
+class AnalyzeCampaignPerformanceInput(_ToolInput):
+    campaign_id: str
 
-class CreateProductBundleInput(BaseModel):
+class CreateProductBundleInput(_ToolInput):
     name: str = Field(description="Bundle name")
     product_ids: List[str] = Field(description="List of product IDs in bundle")
     discount: float = Field(description="Bundle discount percentage")
 
-class UpdatePricingInput(BaseModel):
+class UpdatePricingInput(_ToolInput):
     product_id: str = Field(description="Product identifier")
     new_price: float = Field(description="New regular price")
     sale_price: Optional[float] = Field(default=None, description="Optional sale price")
 
-class CreateAbandonedCartCampaignInput(BaseModel):
+class CreateAbandonedCartCampaignInput(_ToolInput):
     hours_threshold: int = Field(default=24, description="Hours after abandonment to trigger")
 
-class GenerateProductRecommendationsInput(BaseModel):
-    customer_id: str = Field(description="Customer identifier")
+class GenerateProductRecommendationsInput(_ToolInput):
+    customer_id: str
     limit: int = Field(default=5, description="Number of recommendations")
 
-class UpdateSEOMetadataInput(BaseModel):
+class UpdateSEOMetadataInput(_ToolInput):
     product_id: str = Field(description="Product identifier")
     title: str = Field(description="SEO title")
     keywords: List[str] = Field(description="SEO keywords")
     description: str = Field(description="SEO meta description")
 
-class CreateLoyaltyProgramTierInput(BaseModel):
+class CreateLoyaltyProgramTierInput(_ToolInput):
     tier_name: str = Field(description="Tier name")
     min_spend: float = Field(description="Minimum spend to qualify")
     benefits: List[str] = Field(description="List of tier benefits")
@@ -707,6 +995,13 @@ TOOL_REGISTRY = {
     "create_loyalty_program_tier": (create_loyalty_program_tier, CreateLoyaltyProgramTierInput),
 }
 
+# The registry split by column, for callers that need only one side of each entry
+TOOL_FN: Final = {tool_name: func for tool_name, (func, _) in TOOL_REGISTRY.items()}
+TOOL_MODEL: Final = {tool_name: model for tool_name, (_, model) in TOOL_REGISTRY.items()}
+
+# Argument names each tool accepts, for rejecting unknown arguments up front
+TOOL_FIELDS: Final = {tool_name: frozenset(model.model_fields) for tool_name, model in TOOL_MODEL.items()}
+
 # Category mapping for tools
 TOOL_CATEGORIES = {
     "inventory_management": [
@@ -741,4 +1036,281 @@ TOOL_CATEGORIES = {
         "create_product_bundle", "update_pricing", "create_abandoned_cart_campaign",
         "generate_product_recommendations", "update_seo_metadata", "create_loyalty_program_tier"
     ]
-}
\ No newline at end of file
+}
+
+# Reverse index: tool name -> category
+TOOL_TO_CATEGORY: Final = MappingProxyType({
+    tool_name: category
+    for category, tool_names in TOOL_CATEGORIES.items()
+    for tool_name in tool_names
+})
+
+# ============================================================================
+# TOOL SCHEMAS - OpenAI function calling format, built once at import
+# ============================================================================
+
+def _build_openai_schema(tool_name: str, func, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a tool's docstring and model JSON schema to OpenAI function calling schema"""
+    description = func.__doc__.strip() if func.__doc__ else f"Execute {tool_name}"
+    properties = _describe_fields(schema).get("properties", {})
+    return {
+        "type": "function",
+        "function": {
+            "name": tool_name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": schema.get("required", [])
+            }
+        }
+    }
+
+def _describe_fields(node: Any) -> Any:
+    """Add FIELD_DESCRIPTIONS to every object property, at any depth, that has no description of its own"""
+    if isinstance(node, dict):
+        node = {key: _describe_fields(value) for key, value in node.items()}
+        properties = node.get("properties")
+        if isinstance(properties, dict):
+            node["properties"] = {
+                name: {"description": FIELD_DESCRIPTIONS[name], **prop}
+                if isinstance(prop, dict) and "description" not in prop and name in FIELD_DESCRIPTIONS else prop
+                for name, prop in properties.items()
+            }
+        return node
+    if isinstance(node, list):
+        return [_describe_fields(value) for value in node]
+    return node
+
+
+def _inline_refs(node: Any, definitions: Dict[str, Any]) -> Any:
+    """Replace local $ref pointers with the schema they point to, so each tool schema is self-contained"""
+    if isinstance(node, dict):
+        if "$ref" in node:
+            siblings = {key: value for key, value in node.items() if key != "$ref"}
+            return {**_inline_refs(definitions[node["$ref"].rsplit("/", 1)[-1]], definitions), **siblings}
+        return {key: _inline_refs(value, definitions) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(value, definitions) for value in node]
+    return node
+
+
+def _strip_titles(node: Any) -> Any:
+    """
+    Drop the generated "title" annotations, which LLM providers ignore but bill as prompt tokens.
+
+    Only string-valued title keys are removed, so a property named "title" survives.
+    """
+    if isinstance(node, dict):
+        return {key: _strip_titles(value) for key, value in node.items()
+                if not (key == "title" and isinstance(value, str))}
+    if isinstance(node, list):
+        return [_strip_titles(value) for value in node]
+    return node
+
+
+def _build_tool_schemas() -> Dict[str, Dict[str, Any]]:
+    """
+    Build the OpenAI schemas of all tools in one JSON schema generation pass.
+
+    models_json_schema shares a single generator across all input models, so
+    common field types are resolved once instead of once per model.
+    """
+    refs, definitions = models_json_schema([(model, "validation") for model in TOOL_MODEL.values()])
+    model_schemas = definitions["$defs"]
+    return {
+        tool_name: _build_openai_schema(
+            tool_name, TOOL_FN[tool_name],
+            _strip_titles(_inline_refs(refs[(model, "validation")], model_schemas)))
+        for tool_name, model in TOOL_MODEL.items()
+    }
+
+def __getattr__(name: str):
+    # TOOL_SCHEMAS (shared by every consumer - treat as read-only) is built on
+    # first access, so importing the module only to dispatch tools stays cheap
+    if name == "TOOL_SCHEMAS":
+        schemas = MappingProxyType(_build_tool_schemas())
+        globals()["TOOL_SCHEMAS"] = schemas
+        return schemas
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ============================================================================
+# TOOL DISPATCH - Validate LLM tool-call arguments and run the tool
+# ============================================================================
+
+# Table view of the registry: a tool's integer id indexes these parallel tuples
+TOOL_NAMES: Final = tuple(TOOL_REGISTRY)
+TOOL_FUNCTIONS: Final = tuple(TOOL_FN.values())
+TOOL_MODELS: Final = tuple(TOOL_MODEL.values())
+
+# One member per tool, named after it: ToolId.check_stock == 0
+ToolId = IntEnum("ToolId", [(name, tool_id) for tool_id, name in enumerate(TOOL_NAMES)])
+TOOL_IDS: Final = {member.name: member for member in ToolId}
+
+# Category -> ToolIds of its tools, in category order
+CATEGORY_INDICES: Final = MappingProxyType({
+    category: tuple(TOOL_IDS[tool_name] for tool_name in tool_names)
+    for category, tool_names in TOOL_CATEGORIES.items()
+})
+
+
+def dispatch(tool_id: ToolId, arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    """
+    Run a tool by integer id with already-validated keyword arguments.
+
+    Args:
+        tool_id: ToolId member (or its integer value) of the tool
+        arguments: Keyword arguments for the tool
+
+    Returns:
+        Tool response
+    """
+    return TOOL_FUNCTIONS[tool_id](**arguments)
+
+
+class ToolArgumentError(ValueError):
+    """Raised when a tool call passes arguments the tool does not define"""
+
+
+def _resolve_tool_name(tool_name: str) -> str:
+    """
+    Check an LLM-produced tool name and return its interned form.
+
+    The registry keys are interned literals, so lookups with the returned
+    name match by identity and reuse its cached hash.
+    """
+    tool_name = sys.intern(tool_name)
+    if tool_name not in TOOL_FN:
+        raise ValueError(f"Unknown tool: {tool_name}")
+    return tool_name
+
+
+def parse_tool_arguments(tool_name: str, arguments: Union[str, bytes]) -> BaseModel:
+    """
+    Validate the raw JSON arguments of a tool call against the tool's schema.
+
+    The payload is decoded and validated in a single pass by pydantic-core,
+    instead of json.loads followed by model construction.
+
+    Args:
+        tool_name: Name of the tool the LLM called
+        arguments: JSON-encoded arguments from the tool call
+
+    Returns:
+        Validated input model instance
+    """
+    return TOOL_MODEL[_resolve_tool_name(tool_name)].model_validate_json(arguments)
+
+
+def validate_tool_arguments(tool_name: str, arguments: Mapping[str, Any]) -> BaseModel:
+    """
+    Validate already-decoded tool-call arguments against the tool's schema.
+
+    For frameworks that hand over the arguments as a dict. Validation runs
+    directly on the mapping in pydantic-core, without building keyword
+    arguments for the model constructor. Unknown argument names (a common
+    LLM hallucination) are rejected with a set check before validation.
+
+    Args:
+        tool_name: Name of the tool the LLM called
+        arguments: Decoded arguments from the tool call
+
+    Returns:
+        Validated input model instance
+    """
+    tool_name = _resolve_tool_name(tool_name)
+    if not arguments.keys() <= TOOL_FIELDS[tool_name]:
+        unknown = sorted(arguments.keys() - TOOL_FIELDS[tool_name])
+        raise ToolArgumentError(f"Unknown arguments for {tool_name}: {unknown}")
+    return TOOL_MODEL[tool_name].model_validate(arguments)
+
+
+def call_tool(tool_name: str, arguments: Union[str, bytes]) -> Mapping[str, Any]:
+    """
+    Validate the JSON arguments of a tool call and execute the tool.
+
+    Args:
+        tool_name: Name of the tool the LLM called
+        arguments: JSON-encoded arguments from the tool call
+
+    Returns:
+        Tool response
+    """
+    args = parse_tool_arguments(tool_name, arguments)
+    return TOOL_FN[tool_name](**dict(args))
+
+
+def run_tool(tool_name: str, arguments: Mapping[str, Any], *, trusted: bool = False) -> Mapping[str, Any]:
+    """
+    Execute a tool from already-decoded arguments.
+
+    With `trusted=True` the arguments skip validation and are only assembled
+    with model_construct (defaults filled in). Only use this for data that is
+    already known to match the schema, e.g. arguments that passed validation
+    in an earlier attempt of the same call - it performs no type checks.
+
+    Args:
+        tool_name: Name of the tool the LLM called
+        arguments: Decoded arguments from the tool call
+        trusted: Skip validation for arguments known to be valid
+
+    Returns:
+        Tool response
+    """
+    tool_name = _resolve_tool_name(tool_name)
+    if trusted:
+        args = TOOL_MODEL[tool_name].model_construct(**arguments)
+    else:
+        args = validate_tool_arguments(tool_name, arguments)
+    return TOOL_FN[tool_name](**dict(args))
+
+
+def call_tool_json(tool_name: str, arguments: Union[str, bytes]) -> bytes:
+    """
+    Like call_tool, but return the response encoded as JSON bytes.
+
+    Cached read-only tools hand back their pre-encoded response, so repeated
+    calls can be written to the transport without re-serializing.
+
+    Args:
+        tool_name: Name of the tool the LLM called
+        arguments: JSON-encoded arguments from the tool call
+
+    Returns:
+        JSON-encoded tool response
+    """
+    args = parse_tool_arguments(tool_name, arguments)
+    func = TOOL_FN[tool_name]
+    if hasattr(func, "as_json"):
+        return func.as_json(**dict(args))
+    return orjson.dumps(func(**dict(args)))
+
+
+def call_tools(calls: List[Tuple[str, Union[str, bytes]]]) -> List[Mapping[str, Any]]:
+    """
+    Execute all tool calls the LLM made in one turn, in order.
+
+    Identical read-only calls within the turn run once and share a response.
+    Any write call resets that sharing, so reads after a write see its effect.
+
+    Args:
+        calls: (tool_name, JSON arguments) pairs, e.g. from message.tool_calls
+
+    Returns:
+        Tool responses in the same order as the calls
+    """
+    shared: Dict[Tuple[str, Union[str, bytes]], Mapping[str, Any]] = {}
+    responses = []
+    for tool_name, arguments in calls:
+        tool_name = sys.intern(tool_name)
+        call = (tool_name, arguments)
+        func = TOOL_FN.get(tool_name)
+        if not hasattr(func, "cache_key"):
+            shared.clear()
+            responses.append(call_tool(tool_name, arguments))
+            continue
+        if call not in shared:
+            shared[call] = call_tool(tool_name, arguments)
+        responses.append(shared[call])
+    return responses
@@ -0,0 +1,185 @@
+"""
+Tool Response Cache
+Cache-aside layer for read-only tools with per-tool TTLs and write invalidation
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import orjson
+
+KEY_PREFIX = "v1:ecom"
+
+
+class ResponseCache:
+    """
+    In-process key/value store for tool responses.
+
+    Keys follow the `v1:ecom:{tool_name}:{arg_hash}` schema, so the store can be
+    swapped for a shared backend (e.g. Redis SETEX/DEL) without touching the tools.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        Args:
+            maxsize: Maximum number of entries kept before the oldest are evicted
+        """
+        self.maxsize = maxsize
+        # key -> (expires_at, JSON-encoded value)
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        # key -> lock held by the caller currently computing that key
+        self._inflight: Dict[str, threading.Lock] = {}
+        # Guards both dicts above; never held while a tool runs
+        self._lock = threading.Lock()
+
+    def get_json(self, key: str) -> Optional[bytes]:
+        """Return the cached value for a key as JSON bytes, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            return entry[1]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached value for a key, or None if missing or expired.
+
+        Each call decodes a fresh dict, so callers may mutate or serialize it
+        without affecting later hits.
+        """
+        encoded = self.get_json(key)
+        return None if encoded is None else orjson.loads(encoded)
+
+    def set(self, key: str, value: Mapping[str, Any], ttl: float) -> bytes:
+        """Store a value for `ttl` seconds and return its JSON encoding"""
+        encoded = orjson.dumps(value)
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                self._evict()
+            self._entries[key] = (time.monotonic() + ttl, encoded)
+        return encoded
+
+    def delete(self, key: str):
+        """Remove a single key"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        """Remove every key starting with `prefix`"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    @contextlib.contextmanager
+    def single_flight(self, key: str):
+        """
+        Serialize computation of a missing key.
+
+        Concurrent callers that miss on the same key wait for the first one,
+        then find its result on their re-check instead of recomputing it. The
+        in-flight entry is dropped only once the block has stored its value, and
+        only if it still belongs to this computation.
+        """
+        with self._lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                yield
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is lock:
+                        del self._inflight[key]
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        """Drop expired entries, then the oldest ones if still over capacity (caller holds the lock)"""
+        now = time.monotonic()
+        for key in [k for k, entry in self._entries.items() if entry[0] < now]:
+            del self._entries[key]
+        while len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+
+
+# Shared cache used by all tools in ecommerce_tools
+RESPONSE_CACHE = ResponseCache()
+
+
+def make_key(tool_name: str, arguments: Mapping[str, Any]) -> str:
+    """Build the cache key for a tool call from its bound arguments"""
+    payload = json.dumps(arguments, sort_keys=True, default=str).encode()
+    digest = hashlib.blake2b(payload, digest_size=8).hexdigest()
+    return f"{KEY_PREFIX}:{tool_name}:{digest}"
+
+
+def cached(ttl: float, cache: ResponseCache = RESPONSE_CACHE) -> Callable:
+    """
+    Cache a read-only tool's response for `ttl` seconds.
+
+    Arguments are bound against the tool signature (defaults applied) before
+    hashing, so positional and keyword calls share one entry. The response is
+    stored once as JSON; every call returns a freshly decoded dict, and
+    `tool.as_json(...)` returns the stored bytes as-is. On a miss only one caller
+    per key runs the tool; concurrent callers wait and reuse its result.
+
+    Args:
+        ttl: Time to live in seconds
+        cache: Cache instance to store responses in
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def cache_key(*args, **kwargs) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return make_key(func.__name__, bound.arguments)
+
+        def lookup(*args, **kwargs) -> bytes:
+            # The bytes found or stored here are returned as-is, never read back:
+            # another thread may invalidate or evict the key in between
+            key = cache_key(*args, **kwargs)
+            encoded = cache.get_json(key)
+            if encoded is None:
+                with cache.single_flight(key):
+                    encoded = cache.get_json(key)
+                    if encoded is None:
+                        encoded = cache.set(key, func(*args, **kwargs), ttl)
+            return encoded
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return orjson.loads(lookup(*args, **kwargs))
+
+        def as_json(*args, **kwargs) -> bytes:
+            return lookup(*args, **kwargs)
+
+        wrapper.cache_key = cache_key
+        wrapper.as_json = as_json
+        wrapper.ttl = ttl
+        return wrapper
+    return decorator
+
+
+def invalidate(tool: Callable, cache: ResponseCache = RESPONSE_CACHE, **arguments):
+    """
+    Invalidate cached responses of a tool.
+
+    With arguments, only the entry for that exact call is removed; without,
+    every cached response of the tool is dropped.
+    """
+    if arguments:
+        cache.delete(tool.cache_key(**arguments))
+    else:
+        cache.delete_prefix(f"{KEY_PREFIX}:{tool.__name__}:")
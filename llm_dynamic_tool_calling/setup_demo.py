@@ -3,33 +3,41 @@ Setup and Demo Script
 Run this to initialize the database and see examples of tool retrieval
 """
 
+import logging
+import sys
 from tool_manager import ToolManager, initialize_tool_database
-from ecommerce_tools import TOOL_REGISTRY, TOOL_CATEGORIES
-import json
+from ecommerce_tools import TOOL_REGISTRY, TOOL_CATEGORIES, TOOL_SCHEMAS
+
+
+def write_lines(lines):
+    """Write a block of output lines with a single stdout call"""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_section(title: str):
     """Print a formatted section header"""
-    print("\n" + "="*80)
-    print(f"  {title}")
-    print("="*80)
+    write_lines(["\n" + "="*80, f"  {title}", "="*80])
 
 
 def display_tool_details(tool_schema: dict):
     """Pretty print a tool schema"""
     func_info = tool_schema['function']
-    print(f"\n📦 Tool: {func_info['name']}")
-    print(f"   Description: {func_info['description']}")
-    print(f"   Parameters:")
+    lines = [
+        f"\n📦 Tool: {func_info['name']}",
+        f"   Description: {func_info['description']}",
+        f"   Parameters:",
+    ]
 
     params = func_info['parameters']['properties']
     required = func_info['parameters'].get('required', [])
 
     for param_name, param_info in params.items():
         required_marker = " (required)" if param_name in required else " (optional)"
-        print(
+        lines.append(
             f"      • {param_name}{required_marker}: {param_info.get('description', 'No description')}")
 
+    write_lines(lines)
+
 
 def main():
     """Main setup and demo function"""
@@ -43,9 +51,11 @@ def main():
 
     # Show category breakdown
     print_section("STEP 2: Tool Categories Overview")
+    lines = []
     for category, tools in TOOL_CATEGORIES.items():
-        print(f"\n📁 {category.replace('_', ' ').title()}: {len(tools)} tools")
-        print(f"   Sample tools: {', '.join(tools[:3])}")
+        lines.append(f"\n📁 {category.replace('_', ' ').title()}: {len(tools)} tools")
+        lines.append(f"   Sample tools: {', '.join(tools[:3])}")
+    write_lines(lines)
 
     # Demonstrate retrieval by query
     print_section("STEP 3: Retrieve Tools by Query (Semantic Search)")
@@ -57,37 +67,40 @@ def main():
     ]
 
     for query in sample_queries:
-        print(f"\n🔍 Query: '{query}'")
         relevant_tools = manager.retrieve_relevant_tools(query, n_results=3)
-        print(f"   → Retrieved {len(relevant_tools)} most relevant tools:")
-        for tool in relevant_tools:
-            print(f"      • {tool['function']['name']}")
+        lines = [
+            f"\n🔍 Query: '{query}'",
+            f"   → Retrieved {len(relevant_tools)} most relevant tools:",
+        ]
+        lines.extend(f"      • {tool['function']['name']}" for tool in relevant_tools)
+        write_lines(lines)
 
     # Demonstrate category-based retrieval
     print_section("STEP 4: Retrieve Tools by Category")
 
     category = "order_processing"
-    print(f"\n📂 Getting all tools from '{category}' category...")
     category_tools = manager.get_tools_by_category(category)
-    print(f"   → Found {len(category_tools)} tools")
-    print(
-        f"   → Tool names: {[t['function']['name'] for t in category_tools[:5]]}...")
+    write_lines([
+        f"\n📂 Getting all tools from '{category}' category...",
+        f"   → Found {len(category_tools)} tools",
+        f"   → Tool names: {[t['function']['name'] for t in category_tools[:5]]}...",
+    ])
 
     # Show a detailed tool example
     print_section("STEP 5: Detailed Tool Schema Example")
 
     print("\nExample: Let's look at the 'process_refund' tool in detail:")
-    refund_tools = manager.search_tools_by_name("process_refund")
-    if refund_tools:
-        display_tool_details(refund_tools[0])
+    display_tool_details(TOOL_SCHEMAS["process_refund"])
 
     # Demonstrate getting all tools (the naive approach)
     print_section("STEP 6: All Tools (Naive Approach - NOT RECOMMENDED)")
 
     all_tools = manager.get_all_tools()
-    print(f"\n⚠️  Total tools: {len(all_tools)}")
-    print(f"   This would pass ALL {len(all_tools)} tools to the LLM")
-    print(f"   Token usage would be very high and tool selection poor!")
+    write_lines([
+        f"\n⚠️  Total tools: {len(all_tools)}",
+        f"   This would pass ALL {len(all_tools)} tools to the LLM",
+        f"   Token usage would be very high and tool selection poor!",
+    ])
 
     # Show comparison
     print_section("COMPARISON: Different Approaches")
@@ -98,10 +111,10 @@ def main():
         ("Query Retrieval", 10, "Excellent", "Low"),
     ]
 
-    print(f"\n{'Approach':<25} {'# Tools':<12} {'Selection':<12} {'Token Usage'}")
-    print("-" * 70)
+    lines = [f"\n{'Approach':<25} {'# Tools':<12} {'Selection':<12} {'Token Usage'}", "-" * 70]
     for approach, num_tools, selection, tokens in comparison_data:
-        print(f"{approach:<25} {num_tools:<12} {selection:<12} {tokens}")
+        lines.append(f"{approach:<25} {num_tools:<12} {selection:<12} {tokens}")
+    write_lines(lines)
 
     # Final recommendations
     print_section("RECOMMENDATIONS")
@@ -114,18 +127,21 @@ def main():
         "✗ Avoid passing all 70 tools to the LLM at once"
     ]
 
-    for rec in recommendations:
-        print(f"\n{rec}")
+    write_lines(f"\n{rec}" for rec in recommendations)
 
     print_section("SETUP COMPLETE!")
 
-    print("\n✅ Your tool database is ready to use!")
-    print("\nNext steps:")
-    print("   1. Check out the notebooks for implementation examples")
-    print("   2. Run example agents with different tool selection strategies")
-    print("   3. Compare performance between naive, category, and retrieval approaches")
-    print("\n")
+    write_lines([
+        "\n✅ Your tool database is ready to use!",
+        "\nNext steps:",
+        "   1. Check out the notebooks for implementation examples",
+        "   2. Run example agents with different tool selection strategies",
+        "   3. Compare performance between naive, category, and retrieval approaches",
+        "\n",
+    ])
 
 
 if __name__ == "__main__":
+    # Show the database setup progress logged by tool_manager
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     main()
@@ -4,10 +4,19 @@ Quick tests to ensure everything is working correctly
 """
 
 from tool_manager import ToolManager
-from ecommerce_tools import TOOL_REGISTRY, TOOL_CATEGORIES
+from ecommerce_tools import TOOL_REGISTRY, TOOL_CATEGORIES, TOOL_FN, WRITE_INVALIDATIONS
+from response_cache import RESPONSE_CACHE
+import functools
+import inspect
 import json
 
 
+@functools.cache
+def get_manager() -> ToolManager:
+    """ToolManager on the default database, opened once and shared by the read-only tests"""
+    return ToolManager()
+
+
 def test_tool_count():
     """Test: Verify we have exactly 70 tools"""
     print("\n🧪 Test 1: Tool Count")
@@ -56,7 +65,7 @@ def test_schema_conversion():
     print("\n🧪 Test 3: Schema Conversion")
 
     try:
-        manager = ToolManager()
+        manager = get_manager()
 
         # Test converting a few tools
         test_tools = ["check_stock", "process_refund", "create_order"]
@@ -132,7 +141,7 @@ def test_category_retrieval():
     print("\n🧪 Test 5: Category-Based Retrieval")
 
     try:
-        manager = ToolManager()
+        manager = get_manager()
 
         # Test each category
         for category in TOOL_CATEGORIES.keys():
@@ -158,7 +167,7 @@ def test_tool_search():
     print("\n🧪 Test 6: Tool Name Search")
 
     try:
-        manager = ToolManager()
+        manager = get_manager()
 
         # Search for specific tools
         searches = [
@@ -185,6 +194,58 @@ def test_tool_search():
         return False
 
 
+# One call per write tool in WRITE_INVALIDATIONS, touching product P1, order O1
+# and customer C1 (identifiers in CACHE_TEST_IDS)
+WRITE_CALLS = {
+    "update_inventory": {"product_id": "P1", "quantity": 5},
+    "batch_update_inventory": {"updates": [{"product_id": "P1", "quantity": 5}]},
+    "transfer_stock": {"product_id": "P1", "from_warehouse": "WH-01", "to_warehouse": "WH-02", "quantity": 5},
+    "reserve_inventory": {"product_id": "P1", "quantity": 1, "order_id": "O1"},
+    "update_customer_profile": {"customer_id": "C1", "field": "email", "value": "new@example.com"},
+    "update_customer_tier": {"customer_id": "C1", "new_tier": "gold"},
+    "block_customer": {"customer_id": "C1", "reason": "fraud"},
+    "merge_customer_accounts": {"primary_id": "C1", "secondary_id": "C2"},
+    "create_order": {"customer_id": "C1", "items": [{"product_id": "P1", "quantity": 1}], "shipping_address": "1 Main St"},
+    "cancel_order": {"order_id": "O1", "reason": "changed mind"},
+    "update_order_status": {"order_id": "O1", "new_status": "delivered"},
+    "update_shipping_address": {"order_id": "O1", "new_address": "2 Main St"},
+}
+CACHE_TEST_IDS = {"product_id": "P1", "order_id": "O1", "customer_id": "C1"}
+
+
+def test_cache_invalidation():
+    """Test: Verify every write tool drops the cached reads it makes stale"""
+    print("\n🧪 Test 7: Cache Invalidation")
+
+    try:
+        assert set(WRITE_CALLS) == set(WRITE_INVALIDATIONS), "WRITE_CALLS out of sync with WRITE_INVALIDATIONS"
+
+        for write_tool, reads in WRITE_INVALIDATIONS.items():
+            for read_tool, _ in reads:
+                # Required read arguments: the shared ids, anything else a placeholder
+                read_args = {
+                    name: CACHE_TEST_IDS.get(name, "X")
+                    for name, param in inspect.signature(read_tool).parameters.items()
+                    if param.default is inspect.Parameter.empty
+                }
+                key = read_tool.cache_key(**read_args)
+
+                read_tool(**read_args)
+                assert RESPONSE_CACHE.get(key) is not None, f"{read_tool.__name__} was not cached"
+                TOOL_FN[write_tool](**WRITE_CALLS[write_tool])
+                assert RESPONSE_CACHE.get(key) is None, \
+                    f"{write_tool} left {read_tool.__name__} cached"
+
+                print(f"   ✅ {write_tool} -> {read_tool.__name__}")
+
+        print("   ✅ PASSED")
+        return True
+
+    except Exception as e:
+        print(f"   ❌ FAILED: {str(e)}")
+        return False
+
+
 def run_all_tests():
     """Run all tests and report results"""
     print("="*70)
@@ -197,7 +258,8 @@ def run_all_tests():
         test_schema_conversion,
         test_chromadb_integration,
         test_category_retrieval,
-        test_tool_search
+        test_tool_search,
+        test_cache_invalidation
     ]
 
     results = []
@@ -5,23 +5,105 @@ Stores tool descriptions in ChromaDB and retrieves relevant tools based on query
 
 import chromadb
 from chromadb.config import Settings
-import json
-from typing import List, Dict, Any
-from ecommerce_tools import TOOL_REGISTRY, TOOL_CATEGORIES
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
+import logging
+import os
+import sys
+import numpy as np
+import orjson
+from typing import List, Dict, Any, Optional, Tuple
+import ecommerce_tools
+from ecommerce_tools import TOOL_CATEGORIES, TOOL_TO_CATEGORY, TOOL_NAMES
+
+log = logging.getLogger(__name__)
+
+# Static tool embeddings exported by build_tool_embeddings.py, stored next to the ChromaDB data
+# together with the digest of the tool documents they were computed from
+TOOL_EMBEDDINGS_FILE = "tool_embeddings.npz"
+
+# Number of tools embedded and written to ChromaDB per batch when populating the collection
+ADD_SHARD_SIZE = 32
+
+# Number of distinct query embeddings each ToolManager keeps in memory
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# One ChromaDB client per database directory, shared by all ToolManagers in the process
+_CLIENTS: Dict[str, chromadb.ClientAPI] = {}
+
+
+def get_client(persist_directory: str) -> chromadb.ClientAPI:
+    """Get the shared persistent ChromaDB client for a directory, opening it on first use"""
+    path = os.path.abspath(persist_directory)
+    client = _CLIENTS.get(path)
+    if client is None:
+        client = _CLIENTS[path] = chromadb.PersistentClient(path=path)
+    return client
+
+
+def load_embedding_function() -> DefaultEmbeddingFunction:
+    """Load the embedding model and run one input through it, so the first real query isn't slowed by it"""
+    embedding_function = DefaultEmbeddingFunction()
+    embedding_function(["warm-up"])
+    return embedding_function
+
+
+def build_tool_document(tool_name: str, schema: Dict[str, Any]) -> str:
+    """
+    Build the searchable text embedded for a tool
+
+    This includes the function name, description, and parameter details.
+    """
+    description = schema["function"]["description"]
+    params = schema["function"]["parameters"]["properties"]
+    param_descriptions = ", ".join(
+        f"{param_name}: {param_info.get('description', '')}" for param_name, param_info in params.items())
+    return f"{tool_name}. {description}. Parameters: {param_descriptions}"
+
+
+def tool_documents_digest() -> str:
+    """Digest of every tool's name and searchable text in ToolId order; changes whenever a tool's embedding would"""
+    digest = hashlib.blake2b(digest_size=16)
+    for tool_name in TOOL_NAMES:
+        digest.update(build_tool_document(tool_name, ecommerce_tools.TOOL_SCHEMAS[tool_name]).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@functools.cache
+def get_tool_schemas() -> bytes:
+    """
+    Get the schemas of all tools as a JSON array, ready for an LLM request body
+
+    The schemas only depend on the tool definitions, so they are encoded
+    once per process.
+
+    Returns:
+        JSON-encoded list of OpenAI-compatible function schemas
+    """
+    return orjson.dumps(list(ecommerce_tools.TOOL_SCHEMAS.values()))
 
 
 class ToolManager:
     """Manages tool storage and retrieval using ChromaDB"""
 
-    def __init__(self, collection_name: str = "ecommerce_tools", persist_directory: str = "./chroma_db"):
+    def __init__(self, collection_name: str = "ecommerce_tools", persist_directory: str = "./chroma_db",
+                 quantize_embeddings: bool = False, client=None, embedder=None):
         """
         Initialize ChromaDB client and collection
 
         Args:
             collection_name: Name of the ChromaDB collection
             persist_directory: Directory to persist the database
+            quantize_embeddings: Hold the in-memory tool embeddings as int8 (4x smaller than float32).
+                Saves resident memory only: each ranking upcasts the codes to float32, so it is
+                slower than the float32 matrix, not faster
+            client: Already open ChromaDB client (default: the shared client for persist_directory)
+            embedder: Embedding function for tools and queries (default: loaded on first use)
         """
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.client = client if client is not None else get_client(persist_directory)
 
         # Create or get collection
         self.collection = self.client.get_or_create_collection(
@@ -29,10 +111,129 @@ class ToolManager:
             metadata={"description": "E-commerce platform tools"}
         )
 
+        self._build_schema_index()
+
+        # In-memory embedding matrix (row i = ToolId i); queries rank against it instead of ChromaDB
+        self._embedding_function = embedder
+        # Repeated queries (demos, retries, fallbacks) skip the model forward pass
+        self.embed_query = functools.lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._embed_query)
+        self.quantize_embeddings = quantize_embeddings
+        self.tool_embeddings = self._prepare_tool_embeddings(
+            self._load_tool_embeddings(collection_name, persist_directory))
+
+    def _build_schema_index(self):
+        """Build the immutable schema sequences for the non-semantic lookups; callers get list copies"""
+        schemas = ecommerce_tools.TOOL_SCHEMAS
+        self._all_schemas = tuple(schemas.values())
+        self._by_category = {
+            category: tuple(schemas[tool_name] for tool_name in tool_names)
+            for category, tool_names in TOOL_CATEGORIES.items()
+        }
+        self._lower_names = [(tool_name.lower(), tool_name) for tool_name in schemas]
+
+    def _prepare_tool_embeddings(self, matrix):
+        """
+        Convert a float32 embedding matrix to its in-memory ranking form
+
+        With quantization, all rows share one scale, so ranking by dot product
+        with the int8 codes gives the same order as the float vectors up to
+        rounding near ties. int8 @ float32 upcasts the whole matrix on every
+        query, so this trades ranking time for resident memory.
+        """
+        if matrix is None or not self.quantize_embeddings:
+            return matrix
+        scale = 127.0 / max(float(np.abs(matrix).max()), 1e-12)
+        return np.round(matrix * scale).astype(np.int8)
+
+    def _load_tool_embeddings(self, collection_name: str, persist_directory: str):
+        """
+        Load the tool embedding matrix, or None if the collection doesn't hold every tool
+
+        Uses the file exported by build_tool_embeddings.py for the default
+        collection if it was built from the current tool documents, otherwise
+        reads the vectors already stored in ChromaDB. Tools whose stored
+        document no longer matches build_tool_document are re-embedded in
+        memory; refresh_tool_embeddings() writes them back.
+        """
+        embeddings_path = os.path.join(persist_directory, TOOL_EMBEDDINGS_FILE)
+        if collection_name == "ecommerce_tools" and os.path.exists(embeddings_path):
+            with np.load(embeddings_path) as exported:
+                if str(exported["digest"]) == tool_documents_digest():
+                    # NumPy has no float16 BLAS kernels, so upcast once at load
+                    return exported["embeddings"].astype(np.float32)
+            log.warning("%s is stale (tool documents changed); rerun build_tool_embeddings.py", embeddings_path)
+
+        if self.collection.count() == 0:
+            return None
+        matrix, stale = self._sync_tool_embeddings(write=False)
+        if stale:
+            log.warning("Re-embedded %d tools with stale ChromaDB vectors; rerun build_tool_embeddings.py", stale)
+        return matrix
+
+    def _tool_records(self) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Ids, searchable documents and metadata of all tools, in ToolId order"""
+        schemas = ecommerce_tools.TOOL_SCHEMAS
+        ids = list(TOOL_NAMES)
+        documents = [build_tool_document(tool_name, schemas[tool_name]) for tool_name in ids]
+        metadatas = [{
+            "tool_name": tool_name,
+            "category": self.get_tool_category(tool_name),
+            "description": schemas[tool_name]["function"]["description"]
+        } for tool_name in ids]
+        return ids, documents, metadatas
+
+    def _sync_tool_embeddings(self, write: bool) -> Tuple[np.ndarray, int]:
+        """
+        Stored vectors of all tools in ToolId order, re-embedding the stale ones
+
+        A stored vector is stale when its tool is missing from the collection or
+        its stored document differs from the current build_tool_document text.
+
+        Args:
+            write: Upsert the re-embedded tools into ChromaDB
+
+        Returns:
+            (float32 embedding matrix, number of tools re-embedded)
+        """
+        ids, documents, metadatas = self._tool_records()
+        stored = self.collection.get(ids=ids, include=["documents", "embeddings"])
+        rows = {tool_id: (document, embedding)
+                for tool_id, document, embedding in zip(stored["ids"], stored["documents"], stored["embeddings"])}
+
+        stale = [i for i, tool_id in enumerate(ids) if rows.get(tool_id, (None,))[0] != documents[i]]
+        embeddings: List[Optional[Any]] = [rows[tool_id][1] if tool_id in rows else None for tool_id in ids]
+        if stale:
+            fresh = self._get_embedding_function()([documents[i] for i in stale])
+            for i, embedding in zip(stale, fresh):
+                embeddings[i] = embedding
+            if write:
+                self.collection.upsert(
+                    ids=[ids[i] for i in stale],
+                    documents=[documents[i] for i in stale],
+                    embeddings=list(fresh),
+                    metadatas=[metadatas[i] for i in stale]
+                )
+        return np.array(embeddings, dtype=np.float32), len(stale)
+
+    def refresh_tool_embeddings(self) -> int:
+        """
+        Re-embed every tool whose ChromaDB entry is missing or out of date and store the result
+
+        Returns:
+            Number of tools re-embedded
+        """
+        matrix, stale = self._sync_tool_embeddings(write=True)
+        self._build_schema_index()
+        self.tool_embeddings = self._prepare_tool_embeddings(matrix)
+        log.info("✓ Re-embedded %d stale tools", stale)
+        return stale
+
     def convert_to_openai_schema(self, tool_name: str, pydantic_model) -> Dict[str, Any]:
         """
         Convert Pydantic model to OpenAI function calling schema
 
+        The schemas are built once per process (see TOOL_SCHEMAS), so this is a lookup.
+
         Args:
             tool_name: Name of the tool
             pydantic_model: Pydantic model class for the tool
@@ -40,82 +241,52 @@ class ToolManager:
         Returns:
             OpenAI-compatible function schema
         """
-        func, model = TOOL_REGISTRY[tool_name]
-
-        # Get the function docstring as description
-        description = func.__doc__.strip(
-        ) if func.__doc__ else f"Execute {tool_name}"
-
-        # Convert Pydantic model to JSON schema
-        schema = model.model_json_schema()
-
-        # Build OpenAI function format
-        openai_schema = {
-            "type": "function",
-            "function": {
-                "name": tool_name,
-                "description": description,
-                "parameters": {
-                    "type": "object",
-                    "properties": schema.get("properties", {}),
-                    "required": schema.get("required", [])
-                }
-            }
-        }
-        return openai_schema
+        return ecommerce_tools.TOOL_SCHEMAS[tool_name]
+
+    def _get_embedding_function(self) -> DefaultEmbeddingFunction:
+        """Load the embedding model on first use (the same all-MiniLM-L6-v2 model ChromaDB uses)"""
+        if self._embedding_function is None:
+            self._embedding_function = DefaultEmbeddingFunction()
+        return self._embedding_function
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a single query as a read-only float32 vector"""
+        query_embedding = np.asarray(self._get_embedding_function()([query])[0], dtype=np.float32)
+        query_embedding.setflags(write=False)
+        return query_embedding
 
     def get_tool_category(self, tool_name: str) -> str:
         """Get the category of a tool"""
-        for category, tools in TOOL_CATEGORIES.items():
-            if tool_name in tools:
-                return category
-        return "uncategorized"
+        return TOOL_TO_CATEGORY.get(tool_name, "uncategorized")
 
     def add_tools_to_chromadb(self):
         """
         Add all tools to ChromaDB with their descriptions and metadata
         This should be run once to populate the database
         """
-        documents = []
-        metadatas = []
-        ids = []
-
-        for tool_name in TOOL_REGISTRY.keys():
-            func, model = TOOL_REGISTRY[tool_name]
-            schema = self.convert_to_openai_schema(tool_name, model)
-
-            # Create a rich text description for embedding
-            # This includes function name, description, and parameter details
-            description = schema["function"]["description"]
-            params = schema["function"]["parameters"]["properties"]
-
-            # Build searchable text
-            param_descriptions = []
-            for param_name, param_info in params.items():
-                param_desc = f"{param_name}: {param_info.get('description', '')}"
-                param_descriptions.append(param_desc)
-
-            searchable_text = f"{tool_name}. {description}. Parameters: {', '.join(param_descriptions)}"
-
-            # Store in lists for batch insertion
-            documents.append(searchable_text)
-            metadatas.append({
-                "tool_name": tool_name,
-                "category": self.get_tool_category(tool_name),
-                "description": description,
-                # Store full schema as JSON string
-                "schema": json.dumps(schema)
-            })
-            ids.append(tool_name)
-
-        # Add all tools to ChromaDB in batch
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
-
-        print(f"✓ Added {len(documents)} tools to ChromaDB")
+        ids, documents, metadatas = self._tool_records()
+
+        # Embed shards on a worker thread while the previous shard is written to ChromaDB,
+        # so the model forward pass and the SQLite write overlap
+        embed = self._get_embedding_function()
+        shards = [slice(start, start + ADD_SHARD_SIZE) for start in range(0, len(documents), ADD_SHARD_SIZE)]
+        embeddings = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = [executor.submit(embed, documents[shard]) for shard in shards]
+            for shard, future in zip(shards, pending):
+                shard_embeddings = future.result()
+                self.collection.add(
+                    documents=documents[shard],
+                    embeddings=shard_embeddings,
+                    metadatas=metadatas[shard],
+                    ids=ids[shard]
+                )
+                embeddings.extend(shard_embeddings)
+        # Rebuild everything derived from the tool definitions from what was just written
+        self._build_schema_index()
+        self.tool_embeddings = self._prepare_tool_embeddings(np.array(embeddings, dtype=np.float32))
+
+        log.info("✓ Added %d tools to ChromaDB", len(documents))
         return len(documents)
 
     def retrieve_relevant_tools(self, query: str, n_results: int = 15) -> List[Dict[str, Any]]:
@@ -129,22 +300,80 @@ class ToolManager:
         Returns:
             List of OpenAI-compatible function schemas for relevant tools
         """
-        # Query ChromaDB for similar tools
+        query_embedding = self.embed_query(query)
+        if self.tool_embeddings is not None:
+            return self.rank_tools_by_embedding(query_embedding, n_results)
+
+        return self._query_collection([query_embedding.tolist()], n_results)[0]
+
+    def retrieve_relevant_tools_batch(self, queries: List[str], n_results: int = 15) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve the most relevant tools for several queries at once
+
+        All queries are embedded in one model call, which is much cheaper than
+        one call per query for evaluation loops and demos.
+
+        Args:
+            queries: User task/query descriptions
+            n_results: Number of tools to retrieve per query (default: 15)
+
+        Returns:
+            One list of OpenAI-compatible function schemas per query, in query order
+        """
+        if not queries:
+            return []
+        query_embeddings = np.asarray(self._get_embedding_function()(list(queries)), dtype=np.float32)
+        if self.tool_embeddings is not None:
+            return [self.rank_tools_by_embedding(query_embedding, n_results) for query_embedding in query_embeddings]
+
+        return self._query_collection(query_embeddings.tolist(), n_results)
+
+    def _query_collection(self, query_embeddings: List[List[float]], n_results: int) -> List[List[Dict[str, Any]]]:
+        """Query ChromaDB for similar tools, one schema list per query embedding"""
+        # Ids always come back; metadata is only needed for tools unknown to this process
         results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            include=["metadatas"]
         )
 
-        # Extract and parse tool schemas
+        # Schemas live in memory; only collections written by older versions carry them in metadata
+        schemas = ecommerce_tools.TOOL_SCHEMAS
         relevant_tools = []
-
-        if results['ids'] and len(results['ids']) > 0:
-            for metadata in results['metadatas'][0]:
-                schema = json.loads(metadata['schema'])
-                relevant_tools.append(schema)
+        for tool_ids, metadatas in zip(results['ids'], results['metadatas']):
+            tools = []
+            for tool_id, metadata in zip(tool_ids, metadatas):
+                schema = schemas.get(tool_id)
+                if schema is None and metadata and 'schema' in metadata:
+                    schema = orjson.loads(metadata['schema'])
+                if schema is not None:
+                    tools.append(schema)
+            relevant_tools.append(tools)
 
         return relevant_tools
 
+    def rank_tools_by_embedding(self, query_embedding: np.ndarray, n_results: int = 15) -> List[Dict[str, Any]]:
+        """
+        Rank tools against a query embedding using the pre-built embedding matrix
+
+        The stored embeddings are unit-normalized, so ordering by dot product
+        matches ChromaDB's L2 ordering.
+
+        Args:
+            query_embedding: Embedding of the query
+            n_results: Number of tools to return
+
+        Returns:
+            List of OpenAI-compatible function schemas, most relevant first
+        """
+        scores = self.tool_embeddings @ query_embedding
+        n_results = min(n_results, len(scores))
+        if n_results <= 0:
+            return []
+        top = np.argpartition(-scores, n_results - 1)[:n_results]
+        top = top[np.argsort(-scores[top])]
+        return [ecommerce_tools.TOOL_SCHEMAS[TOOL_NAMES[tool_id]] for tool_id in top]
+
     def get_tools_by_category(self, category: str) -> List[Dict[str, Any]]:
         """
         Get all tools from a specific category
@@ -155,19 +384,12 @@ class ToolManager:
         Returns:
             List of OpenAI-compatible function schemas for tools in category
         """
-        if category not in TOOL_CATEGORIES:
+        tools = self._by_category.get(category)
+        if tools is None:
             raise ValueError(
                 f"Category '{category}' not found. Available: {list(TOOL_CATEGORIES.keys())}")
 
-        tool_names = TOOL_CATEGORIES[category]
-        tools = []
-
-        for tool_name in tool_names:
-            schema = self.convert_to_openai_schema(
-                tool_name, TOOL_REGISTRY[tool_name][1])
-            tools.append(schema)
-
-        return tools
+        return list(tools)
 
     def get_all_tools(self) -> List[Dict[str, Any]]:
         """
@@ -176,12 +398,7 @@ class ToolManager:
         Returns:
             List of all tool schemas
         """
-        tools = []
-        for tool_name in TOOL_REGISTRY.keys():
-            schema = self.convert_to_openai_schema(
-                tool_name, TOOL_REGISTRY[tool_name][1])
-            tools.append(schema)
-        return tools
+        return list(self._all_schemas)
 
     def search_tools_by_name(self, search_term: str) -> List[Dict[str, Any]]:
         """
@@ -193,13 +410,9 @@ class ToolManager:
         Returns:
             List of matching tool schemas
         """
-        matching_tools = []
-        for tool_name in TOOL_REGISTRY.keys():
-            if search_term.lower() in tool_name.lower():
-                schema = self.convert_to_openai_schema(
-                    tool_name, TOOL_REGISTRY[tool_name][1])
-                matching_tools.append(schema)
-        return matching_tools
+        search_term = search_term.lower()
+        schemas = ecommerce_tools.TOOL_SCHEMAS
+        return [schemas[tool_name] for lower_name, tool_name in self._lower_names if search_term in lower_name]
 
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the tool collection"""
@@ -223,7 +436,10 @@ class ToolManager:
             name=self.collection.name,
             metadata={"description": "E-commerce platform tools"}
         )
-        print(f"✓ Collection '{self.collection.name}' reset")
+        # The in-memory matrix described the deleted collection; rank through ChromaDB until it is repopulated
+        self.tool_embeddings = None
+        self._build_schema_index()
+        log.info("✓ Collection '%s' reset", self.collection.name)
 
 
 # ============================================================================
@@ -241,23 +457,27 @@ def initialize_tool_database(persist_directory: str = "./chroma_db") -> ToolMana
     Returns:
         Initialized ToolManager instance
     """
-    print("Initializing Tool Database...")
-    manager = ToolManager(persist_directory=persist_directory)
+    log.info("Initializing Tool Database...")
+    # Opening the database and loading the embedding model are independent, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        client = executor.submit(get_client, persist_directory)
+        embedder = executor.submit(load_embedding_function)
+        manager = ToolManager(persist_directory=persist_directory,
+                              client=client.result(), embedder=embedder.result())
 
     # Check if collection is empty
     if manager.collection.count() == 0:
-        print("Populating database with tools...")
+        log.info("Populating database with tools...")
         manager.add_tools_to_chromadb()
     else:
-        print(f"Database already contains {manager.collection.count()} tools")
+        log.info("Database already contains %d tools", manager.collection.count())
 
-    # Print stats
-    stats = manager.get_collection_stats()
-    print(f"\n📊 Database Statistics:")
-    print(f"   Total tools: {stats['total_tools']}")
-    print(f"   Categories:")
-    for category, count in stats['categories'].items():
-        print(f"      - {category}: {count} tools")
+    # Log stats (skipped entirely, including the count query, unless INFO is enabled)
+    if log.isEnabledFor(logging.INFO):
+        stats = manager.get_collection_stats()
+        lines = ["\n📊 Database Statistics:", f"   Total tools: {stats['total_tools']}", "   Categories:"]
+        lines.extend(f"      - {category}: {count} tools" for category, count in stats['categories'].items())
+        log.info("\n".join(lines))
 
     return manager
 
@@ -281,13 +501,14 @@ def demo_tool_retrieval(manager: ToolManager):
         "Process a new order and calculate shipping costs"
     ]
 
-    for i, query in enumerate(test_queries, 1):
+    # One batched embedding pass for all demo queries
+    all_relevant_tools = manager.retrieve_relevant_tools_batch(test_queries, n_results=5)
+
+    for i, (query, relevant_tools) in enumerate(zip(test_queries, all_relevant_tools), 1):
         print(f"\n{'─'*70}")
         print(f"Query {i}: {query}")
         print(f"{'─'*70}")
 
-        relevant_tools = manager.retrieve_relevant_tools(query, n_results=5)
-
         print(f"Top 5 relevant tools:")
         for j, tool in enumerate(relevant_tools, 1):
             tool_name = tool['function']['name']
@@ -298,6 +519,8 @@ def demo_tool_retrieval(manager: ToolManager):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     # Initialize the tool database
     manager = initialize_tool_database()
 
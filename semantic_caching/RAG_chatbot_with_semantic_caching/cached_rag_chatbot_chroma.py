@@ -8,24 +8,286 @@ FIXES:
 - Fallback answer when documents aren't relevant
 """
 
-from typing import Literal, Annotated
+from typing import Literal, Annotated, Optional
 from pydantic import BaseModel, Field
 from langgraph.graph import MessagesState, StateGraph, START, END
 from langgraph.prebuilt import ToolNode, tools_condition
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langchain.tools import tool
 from langchain.chat_models import init_chat_model
+from langchain_core.runnables import RunnableConfig
+import asyncio
+import collections
+import contextlib
+import functools
+import json
 import operator
+import os
+import tempfile
+import threading
+import numpy as np
 from pyprojroot import here
 
-from semantic_cache import SemanticCache
+from semantic_cache import SemanticCache, read_pairs_from_file
 from document_store_chroma import DocumentVectorStore
 
 
 # Extended state to track retries
 class ExtendedState(MessagesState):
-    """Extended state with retry counter."""
+    """Extended state with retry counter and the original user question."""
     retry_count: Annotated[int, operator.add] = 0
+    question: str
+
+
+class GradeDocuments(BaseModel):
+    """Grade documents using a binary score for relevance check."""
+    binary_score: str = Field(
+        description="Relevance score: 'yes' if relevant, or 'no' if not relevant"
+    )
+
+
+# Prompt templates, filled with str.format on each request.
+# Grading, answering and fallback prompts are split into a static system message
+# and a per-request user message, so every request shares the same prompt prefix
+# and backends with prefix caching can reuse it.
+GRADE_SYSTEM_PROMPT = (
+    "You are a grader assessing relevance of a retrieved document to a user question. \n"
+    "If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n"
+    "Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question."
+)
+
+GRADE_USER_PROMPT = (
+    "Here is the retrieved document: \n\n {context} \n\n"
+    "Here is the user question: {question}"
+)
+
+REWRITE_PROMPT = (
+    "Look at the input and try to reason about the underlying semantic intent / meaning.\n"
+    "Here is the initial question:"
+    "\n ------- \n"
+    "{question}"
+    "\n ------- \n"
+    "Formulate an improved question:"
+)
+
+GENERATE_SYSTEM_PROMPT = (
+    "You are a helpful TaskFlow assistant for question-answering tasks. "
+    "Use the following pieces of retrieved context to answer the question. "
+    "If you don't know the answer, just say that you don't know. "
+    "Use three sentences maximum and keep the answer concise."
+)
+
+GENERATE_USER_PROMPT = (
+    "Question: {question} \n"
+    "Context: {context}"
+)
+
+FALLBACK_SYSTEM_PROMPT = (
+    "You are a helpful TaskFlow assistant. "
+    "A user asked the following question, but we couldn't find relevant information in our documentation.\n\n"
+    "Provide a helpful response that:\n"
+    "1. Politely acknowledges we don't have specific information about this in our TaskFlow documentation\n"
+    "2. Suggests what they could try (contact support, check our website, rephrase question)\n"
+    "3. If you can infer what they're asking about, provide general helpful context\n"
+    "Keep it brief and friendly."
+)
+
+FALLBACK_USER_PROMPT = "Question: {question}"
+
+# Learned grading thresholds, stored next to the ChromaDB data
+GRADING_THRESHOLDS_FILE = "grading_thresholds.json"
+# Recent retrievals the learned thresholds are computed from, and how often
+# (in retrievals) they are recomputed
+DISTANCE_HISTORY_SIZE = 1024
+THRESHOLD_UPDATE_INTERVAL = 64
+
+# Retriever tool output when the search returns no documents
+NO_DOCUMENTS_FOUND = "NO_DOCUMENTS_FOUND"
+
+# Run tag marking the LLM calls whose tokens are streamed to the user
+ANSWER_TAG = "final"
+
+# Answer returned when the workflow hits LangGraph's recursion limit
+RECURSION_ERROR_ANSWER = (
+    "I encountered an error while searching for an answer. The question might be too complex or outside our documentation scope. Please try:\n"
+    "• Rephrasing your question\n"
+    "• Asking about specific TaskFlow features\n"
+    "• Breaking down complex questions"
+)
+
+
+# The workflow below is compiled once per process and shared by every
+# CachedRAGChatbot. Nodes find the instance they run for in
+# config["configurable"]["chatbot"] (see CachedRAGChatbot._graph_config).
+def _chatbot(config: RunnableConfig) -> "CachedRAGChatbot":
+    """The chatbot instance a graph run belongs to."""
+    return config["configurable"]["chatbot"]
+
+
+# Retriever tool. The closest document's distance rides along as the tool
+# message artifact so grading can skip the LLM grader on clear cases.
+@tool(response_format="content_and_artifact")
+def retrieve_documents(query: str, config: RunnableConfig) -> tuple[str, Optional[float]]:
+    """Search and return relevant information from the TaskFlow documentation."""
+    chatbot = _chatbot(config)
+    # aquery may already have searched for the user's question while checking the cache
+    prefetched = config["configurable"].get("prefetched_retrieval")
+    if prefetched is not None and prefetched[0] == query:
+        results = prefetched[1]
+    else:
+        results = chatbot._search_documents(query)
+    if not results:
+        return NO_DOCUMENTS_FOUND, None
+    min_distance = min(score for _, score in results)
+    chatbot._record_distance(min_distance)
+    return "\n\n".join([doc.page_content for doc, _ in results]), min_distance
+
+
+# Define node functions
+def generate_query_or_respond(state: ExtendedState, config: RunnableConfig):
+    """Generate a response or decide to retrieve documents."""
+    # Only the latest user turn: after a rewrite, the failed retrieval
+    # round before it is not sent to the model again
+    messages = state["messages"]
+    start = max(i for i, message in enumerate(messages)
+                if isinstance(message, HumanMessage))
+    response = _chatbot(config)._model_with_tools.invoke(messages[start:])
+    return {"messages": [response]}
+
+
+# Grade documents
+def grade_documents(
+    state: ExtendedState,
+    config: RunnableConfig,
+) -> Literal["generate_answer", "rewrite_question", "generate_fallback"]:
+    """Determine whether the retrieved documents are relevant to the question."""
+    chatbot = _chatbot(config)
+    question = state["question"]
+    context = state["messages"][-1].content
+    retry_count = state.get("retry_count", 0)
+
+    # Check if we've hit max retries
+    if retry_count >= chatbot.max_retries:
+        print(
+            f"⚠️  Max retries ({chatbot.max_retries}) reached. Generating fallback answer...")
+        return "generate_fallback"
+
+    if context == NO_DOCUMENTS_FOUND:
+        print(
+            f"❌ No documents found. Will rewrite question (attempt {retry_count + 1}/{chatbot.max_retries})...")
+        return "rewrite_question"
+
+    # Clear cases are decided by retrieval distance alone, when cutoffs are set
+    min_distance = getattr(state["messages"][-1], "artifact", None)
+    relevant_distance, irrelevant_distance = chatbot.relevant_distance, chatbot.irrelevant_distance
+    if min_distance is not None and relevant_distance is not None and min_distance < relevant_distance:
+        return "generate_answer"
+    if min_distance is not None and irrelevant_distance is not None and min_distance > irrelevant_distance:
+        print(
+            f"❌ Documents not relevant (distance {min_distance:.3f}). Will rewrite question (attempt {retry_count + 1}/{chatbot.max_retries})...")
+        return "rewrite_question"
+
+    response = chatbot._grader.invoke([
+        {"role": "system", "content": GRADE_SYSTEM_PROMPT},
+        {"role": "user", "content": GRADE_USER_PROMPT.format(question=question, context=context)}
+    ])
+    score = response.binary_score
+
+    if score == "yes":
+        return "generate_answer"
+    else:
+        print(
+            f"❌ Documents not relevant. Will rewrite question (attempt {retry_count + 1}/{chatbot.max_retries})...")
+        return "rewrite_question"
+
+
+# Rewrite question
+def rewrite_question(state: ExtendedState, config: RunnableConfig):
+    """Rewrite the original user question and increment retry counter."""
+    chatbot = _chatbot(config)
+    question = state["question"]
+    retry_count = state.get("retry_count", 0)
+
+    print(
+        f"🔄 Rewriting question (attempt {retry_count + 1}/{chatbot.max_retries})...")
+
+    prompt = REWRITE_PROMPT.format(question=question)
+    response = chatbot.response_model.invoke(
+        [{"role": "user", "content": prompt}])
+
+    print(f"   New question: {response.content}")
+
+    return {
+        "messages": [HumanMessage(content=response.content)],
+        "retry_count": 1  # Increment by 1
+    }
+
+
+# Generate answer
+def generate_answer(state: ExtendedState, config: RunnableConfig):
+    """Generate an answer from retrieved context."""
+    question = state["question"]
+    context = state["messages"][-1].content
+    response = _chatbot(config)._answer_model.invoke([
+        {"role": "system", "content": GENERATE_SYSTEM_PROMPT},
+        {"role": "user", "content": GENERATE_USER_PROMPT.format(question=question, context=context)}
+    ])
+    return {"messages": [response]}
+
+
+# Generate fallback answer when docs aren't relevant
+def generate_fallback(state: ExtendedState, config: RunnableConfig):
+    """Generate a fallback answer when docs aren't relevant after retries."""
+    question = state["question"]
+    response = _chatbot(config)._answer_model.invoke([
+        {"role": "system", "content": FALLBACK_SYSTEM_PROMPT},
+        {"role": "user", "content": FALLBACK_USER_PROMPT.format(question=question)}
+    ])
+    return {"messages": [response]}
+
+
+@functools.cache
+def _compiled_graph():
+    """Build and compile the RAG workflow with retry logic (once per process)."""
+    workflow = StateGraph(ExtendedState)
+
+    workflow.add_node("generate_query_or_respond",
+                      generate_query_or_respond)
+    workflow.add_node("retrieve", ToolNode([retrieve_documents]))
+    workflow.add_node("rewrite_question", rewrite_question)
+    workflow.add_node("generate_answer", generate_answer)
+    # New fallback node
+    workflow.add_node("generate_fallback", generate_fallback)
+
+    workflow.add_edge(START, "generate_query_or_respond")
+
+    workflow.add_conditional_edges(
+        "generate_query_or_respond",
+        tools_condition,
+        {
+            "tools": "retrieve",
+            END: END,
+        },
+    )
+
+    workflow.add_conditional_edges(
+        "retrieve",
+        grade_documents,
+        {
+            "generate_answer": "generate_answer",
+            "rewrite_question": "rewrite_question",
+            "generate_fallback": "generate_fallback"  # New fallback path
+        }
+    )
+    workflow.add_edge("generate_answer", END)
+    workflow.add_edge("generate_fallback", END)  # Fallback ends workflow
+    workflow.add_edge("rewrite_question", "generate_query_or_respond")
+
+    # Compile with recursion limit
+    return workflow.compile(
+        checkpointer=None,
+        debug=False
+    )
 
 
 class CachedRAGChatbot:
@@ -38,7 +300,12 @@ class CachedRAGChatbot:
         temperature: float = 0,
         chroma_persist_dir: str = str(here("data/chroma_db")),
         chroma_collection: str = "taskflow_docs",
-        max_retries: int = 2  # Maximum question rewrites
+        max_retries: int = 2,  # Maximum question rewrites
+        relevant_distance: Optional[float] = None,
+        irrelevant_distance: Optional[float] = None,
+        request_timeout: float = 60,
+        cache_writeback: bool = False,
+        learn_grading_thresholds: bool = False
     ):
         """
         Initialize the cached RAG chatbot.
@@ -50,16 +317,46 @@ class CachedRAGChatbot:
             chroma_persist_dir: ChromaDB persistence directory
             chroma_collection: ChromaDB collection name
             max_retries: Maximum number of question rewrite attempts
+            relevant_distance: Closest-document distance below which the retrieved
+                              documents are treated as relevant without the LLM grader
+                              (None: always ask the grader)
+            irrelevant_distance: Closest-document distance above which the question
+                              is rewritten without the LLM grader (None: always ask
+                              the grader). Both are in the collection's hnsw:space
+                              metric; Chroma's default "l2" is squared L2, which for
+                              normalized embeddings is 2 * (1 - cosine similarity),
+                              so calibrate them on your own retrievals
+            request_timeout: Timeout in seconds for each LLM request
+            cache_writeback: Add every answer generated from relevant documents to
+                              the semantic cache (off by default so only approved
+                              answers are cached)
+            learn_grading_thresholds: Set relevant_distance / irrelevant_distance
+                              to the 10th / 90th percentile of recent retrieval
+                              distances, persisted in chroma_persist_dir
         """
         self.cache = SemanticCache(distance_threshold=cache_distance_threshold)
         self.doc_store = DocumentVectorStore(
             persist_directory=chroma_persist_dir,
             collection_name=chroma_collection
         )
-        self.response_model = init_chat_model(
-            model_name, temperature=temperature)
-        self.grader_model = init_chat_model(model_name, temperature=0)
+        # One chat model (and HTTP connection pool) shared by every node; the
+        # answering temperature is bound per request, grading runs at 0
+        self.temperature = temperature
+        self.chat_model = init_chat_model(
+            model_name, temperature=0, timeout=request_timeout)
+        self.response_model = self.chat_model.bind(temperature=temperature)
+        self.grader_model = self.chat_model
         self.max_retries = max_retries
+        self.relevant_distance = relevant_distance
+        self.irrelevant_distance = irrelevant_distance
+        self.cache_writeback = cache_writeback
+        self.learn_grading_thresholds = learn_grading_thresholds
+        self._distance_history = collections.deque(maxlen=DISTANCE_HISTORY_SIZE)
+        self._distances_recorded = 0
+        # query_batch records distances from several threads at once
+        self._thresholds_lock = threading.Lock()
+        if learn_grading_thresholds:
+            self._load_grading_thresholds()
 
         # Will be set when graph is compiled
         self.graph = None
@@ -83,13 +380,7 @@ class CachedRAGChatbot:
 
     def load_cache_from_file(self, filepath: str):
         """Load cache from a CSV file."""
-        import csv
-        pairs = []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                pairs.append((row['question'], row['answer']))
-        self.cache.hydrate_from_pairs(pairs)
+        self.cache.hydrate_from_pairs(read_pairs_from_file(filepath))
 
     def save_cache_to_file(self, filepath: str):
         """Save cache to a CSV file."""
@@ -99,182 +390,110 @@ class CachedRAGChatbot:
         """Get statistics about the vectorstore."""
         return self.doc_store.get_stats()
 
-    def _setup_graph(self):
-        """Setup the LangGraph workflow with retry logic."""
-        # Create retriever tool
-        retriever = self.doc_store.get_retriever(k=4)
-
-        @tool
-        def retrieve_documents(query: str) -> str:
-            """Search and return relevant information from the TaskFlow documentation."""
-            docs = retriever.invoke(query)
-            return "\n\n".join([doc.page_content for doc in docs])
-
-        self.retriever_tool = retrieve_documents
-
-        # Define node functions
-        def generate_query_or_respond(state: ExtendedState):
-            """Generate a response or decide to retrieve documents."""
-            response = (
-                self.response_model
-                .bind_tools([self.retriever_tool])
-                .invoke(state["messages"])
-            )
-            return {"messages": [response]}
-
-        # Grade documents prompt and model
-        GRADE_PROMPT = (
-            "You are a grader assessing relevance of a retrieved document to a user question. \n "
-            "Here is the retrieved document: \n\n {context} \n\n"
-            "Here is the user question: {question} \n"
-            "If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n"
-            "Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question."
-        )
-
-        class GradeDocuments(BaseModel):
-            """Grade documents using a binary score for relevance check."""
-            binary_score: str = Field(
-                description="Relevance score: 'yes' if relevant, or 'no' if not relevant"
-            )
-
-        def grade_documents(
-            state: ExtendedState,
-        ) -> Literal["generate_answer", "rewrite_question", "generate_fallback"]:
-            """Determine whether the retrieved documents are relevant to the question."""
-            question = state["messages"][0].content
-            context = state["messages"][-1].content
-            retry_count = state.get("retry_count", 0)
-
-            # Check if we've hit max retries
-            if retry_count >= self.max_retries:
-                print(
-                    f"⚠️  Max retries ({self.max_retries}) reached. Generating fallback answer...")
-                return "generate_fallback"
-
-            prompt = GRADE_PROMPT.format(question=question, context=context)
-            response = (
-                self.grader_model
-                .with_structured_output(GradeDocuments)
-                .invoke([{"role": "user", "content": prompt}])
-            )
-            score = response.binary_score
-
-            if score == "yes":
-                return "generate_answer"
-            else:
-                print(
-                    f"❌ Documents not relevant. Will rewrite question (attempt {retry_count + 1}/{self.max_retries})...")
-                return "rewrite_question"
-
-        # Rewrite question
-        REWRITE_PROMPT = (
-            "Look at the input and try to reason about the underlying semantic intent / meaning.\n"
-            "Here is the initial question:"
-            "\n ------- \n"
-            "{question}"
-            "\n ------- \n"
-            "Formulate an improved question:"
-        )
+    def _thresholds_path(self) -> str:
+        """File the learned grading thresholds are persisted in."""
+        return os.path.join(self.doc_store.persist_directory, GRADING_THRESHOLDS_FILE)
 
-        def rewrite_question(state: ExtendedState):
-            """Rewrite the original user question and increment retry counter."""
-            messages = state["messages"]
-            question = messages[0].content
-            retry_count = state.get("retry_count", 0)
+    def _load_grading_thresholds(self):
+        """Restore grading thresholds learned in an earlier run; keep the defaults if missing or corrupt."""
+        try:
+            with open(self._thresholds_path(), encoding="utf-8") as f:
+                thresholds = json.load(f)
+            relevant, irrelevant = float(thresholds["relevant_distance"]), float(thresholds["irrelevant_distance"])
+        except (OSError, ValueError, TypeError, KeyError):
+            return
+        self.relevant_distance = relevant
+        self.irrelevant_distance = irrelevant
 
-            print(
-                f"🔄 Rewriting question (attempt {retry_count + 1}/{self.max_retries})...")
+    def _record_distance(self, distance: float):
+        """Track a retrieval distance and periodically re-learn the grading thresholds."""
+        if not self.learn_grading_thresholds:
+            return
+        with self._thresholds_lock:
+            self._distance_history.append(distance)
+            self._distances_recorded += 1
+            if self._distances_recorded % THRESHOLD_UPDATE_INTERVAL:
+                return
+
+            # The clearest 10% of retrievals on either side skip the LLM grader
+            low, high = np.quantile(np.array(self._distance_history, dtype=np.float64), [0.1, 0.9])
+            self.relevant_distance = float(low)
+            self.irrelevant_distance = float(high)
+            self._save_grading_thresholds()
+
+    def _save_grading_thresholds(self):
+        """Persist the current grading thresholds atomically (write a temp file, then rename)."""
+        path = self._thresholds_path()
+        with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            json.dump({
+                "relevant_distance": self.relevant_distance,
+                "irrelevant_distance": self.irrelevant_distance
+            }, f)
+        os.replace(f.name, path)
+
+    def _search_documents(self, query: str, query_embedding: Optional[np.ndarray] = None) -> list:
+        """
+        Retrieve (document, distance) pairs for a query, closest first; no side effects.
 
-            prompt = REWRITE_PROMPT.format(question=question)
-            response = self.response_model.invoke(
-                [{"role": "user", "content": prompt}])
+        query_embedding is the cache's embedding of the query, used only when
+        cache and documents share an embedding model.
+        """
+        k = self._k_for(query)
+        embedding = None
+        if self._share_query_embeddings:
+            if query_embedding is None:
+                query_embedding = self.cache.embed_query(query)
+            embedding = query_embedding.tolist()
+
+        if k > 4:
+            # Long, multi-part questions: diversify so the extra documents
+            # cover more of the question instead of repeating the top hit
+            if embedding is None:
+                embedding = self.doc_store.embeddings.embed_query(query)
+            return self.doc_store.max_marginal_relevance_search_with_score(
+                embedding, k=k, fetch_k=2 * k, lambda_mult=0.5)
+        if embedding is not None:
+            return self.doc_store.similarity_search_by_vector_with_score(
+                embedding, k=k)
+        return self.doc_store.similarity_search_with_score(query, k=k)
+
+    @staticmethod
+    def _k_for(query: str) -> int:
+        """Number of documents to retrieve, scaled with the length of the query."""
+        words = len(query.split())
+        if words < 8:
+            return 2
+        if words < 25:
+            return 4
+        return 8
 
-            print(f"   New question: {response.content}")
+    def _setup_graph(self):
+        """Bind this instance's models and attach the shared LangGraph workflow."""
+        # When cache and documents use the same embedding model, retrieval reuses
+        # the cache's memoized query embeddings; a verbatim question embedded by
+        # cache.check is not embedded again.
+        cache_model = getattr(self.cache.embeddings, "model", None)
+        self._share_query_embeddings = cache_model is not None and cache_model == getattr(
+            self.doc_store.embeddings, "model", None)
 
-            return {
-                "messages": [HumanMessage(content=response.content)],
-                "retry_count": 1  # Increment by 1
-            }
+        self.retriever_tool = retrieve_documents
 
-        # Generate answer
-        GENERATE_PROMPT = (
-            "You are a helpful TaskFlow assistant for question-answering tasks. "
-            "Use the following pieces of retrieved context to answer the question. "
-            "If you don't know the answer, just say that you don't know. "
-            "Use three sentences maximum and keep the answer concise.\n"
-            "Question: {question} \n"
-            "Context: {context}"
-        )
+        # Bind the tool and the structured grader output once, not on every turn
+        self._model_with_tools = self.chat_model.bind_tools(
+            [self.retriever_tool]).bind(temperature=self.temperature)
+        self._grader = self.grader_model.with_structured_output(GradeDocuments)
+        # Tagged so query_stream can pick out the user-facing answer tokens
+        self._answer_model = self.response_model.with_config(tags=[ANSWER_TAG])
 
-        def generate_answer(state: ExtendedState):
-            """Generate an answer from retrieved context."""
-            question = state["messages"][0].content
-            context = state["messages"][-1].content
-            prompt = GENERATE_PROMPT.format(question=question, context=context)
-            response = self.response_model.invoke(
-                [{"role": "user", "content": prompt}])
-            return {"messages": [response]}
-
-        # Generate fallback answer when docs aren't relevant
-        FALLBACK_PROMPT = (
-            "You are a helpful TaskFlow assistant. "
-            "A user asked the following question, but we couldn't find relevant information in our documentation.\n"
-            "Question: {question}\n\n"
-            "Provide a helpful response that:\n"
-            "1. Politely acknowledges we don't have specific information about this in our TaskFlow documentation\n"
-            "2. Suggests what they could try (contact support, check our website, rephrase question)\n"
-            "3. If you can infer what they're asking about, provide general helpful context\n"
-            "Keep it brief and friendly."
-        )
+        self.graph = _compiled_graph()
 
-        def generate_fallback(state: ExtendedState):
-            """Generate a fallback answer when docs aren't relevant after retries."""
-            question = state["messages"][0].content
-            prompt = FALLBACK_PROMPT.format(question=question)
-            response = self.response_model.invoke(
-                [{"role": "user", "content": prompt}])
-            return {"messages": [response]}
-
-        # Build the graph
-        workflow = StateGraph(ExtendedState)
-
-        workflow.add_node("generate_query_or_respond",
-                          generate_query_or_respond)
-        workflow.add_node("retrieve", ToolNode([self.retriever_tool]))
-        workflow.add_node("rewrite_question", rewrite_question)
-        workflow.add_node("generate_answer", generate_answer)
-        # New fallback node
-        workflow.add_node("generate_fallback", generate_fallback)
-
-        workflow.add_edge(START, "generate_query_or_respond")
-
-        workflow.add_conditional_edges(
-            "generate_query_or_respond",
-            tools_condition,
-            {
-                "tools": "retrieve",
-                END: END,
-            },
-        )
-
-        workflow.add_conditional_edges(
-            "retrieve",
-            grade_documents,
-            {
-                "generate_answer": "generate_answer",
-                "rewrite_question": "rewrite_question",
-                "generate_fallback": "generate_fallback"  # New fallback path
-            }
-        )
-        workflow.add_edge("generate_answer", END)
-        workflow.add_edge("generate_fallback", END)  # Fallback ends workflow
-        workflow.add_edge("rewrite_question", "generate_query_or_respond")
-
-        # Compile with recursion limit
-        self.graph = workflow.compile(
-            checkpointer=None,
-            debug=False
-        )
+    def _graph_config(self, prefetched_retrieval: Optional[tuple] = None) -> dict:
+        """Run config for the shared graph, carrying this instance (and any prefetched retrieval) to its nodes."""
+        return {
+            "recursion_limit": 50,  # Set reasonable recursion limit
+            "configurable": {"chatbot": self, "prefetched_retrieval": prefetched_retrieval}
+        }
 
     def query(self, question: str, verbose: bool = False) -> dict:
         """
@@ -324,20 +543,22 @@ class CachedRAGChatbot:
         # Run the RAG workflow with recursion limit
         try:
             result = None
-            config = {"recursion_limit": 50}  # Set reasonable recursion limit
+            last_node = None
+            config = self._graph_config()
 
             for chunk in self.graph.stream(
-                {"messages": [{"role": "user", "content": question}],
-                    "retry_count": 0},
+                self._initial_state(question),
                 config=config
             ):
                 for node, update in chunk.items():
                     if verbose:
                         print(f"\n📍 Node: {node}")
                     result = update
+                    last_node = node
 
             # Extract the final answer
             answer = result["messages"][-1].content
+            self._write_back(question, last_node, answer)
 
             if verbose:
                 print(f"\n💬 Answer (from RAG): {answer}\n")
@@ -353,13 +574,195 @@ class CachedRAGChatbot:
             error_message = str(e)
             if "recursion" in error_message.lower():
                 return {
-                    "answer": "I encountered an error while searching for an answer. The question might be too complex or outside our documentation scope. Please try:\n• Rephrasing your question\n• Asking about specific TaskFlow features\n• Breaking down complex questions",
+                    "answer": RECURSION_ERROR_ANSWER,
                     "cache_hit": False,
                     "cache_info": None
                 }
             else:
                 raise e
 
+    async def aquery(self, question: str) -> dict:
+        """
+        Query the chatbot with semantic caching, overlapping the cache lookup with document retrieval.
+
+        The document search for the question runs on a worker thread while the
+        cache is checked; a cache hit discards it. On a miss the RAG workflow
+        reuses it when the model retrieves with the question verbatim. Only the
+        side-effect-free search is speculative: no LLM call is made and nothing
+        is recorded until the cache has missed. When cache and documents share
+        an embedding model, the question is embedded once up front and both
+        lookups use that vector.
+
+        Args:
+            question: User's question
+
+        Returns:
+            Dictionary with 'answer', 'cache_hit', and 'cache_info' (same as query)
+        """
+        if self.graph is None:
+            raise ValueError("Graph not initialized. Load vectorstore first.")
+
+        # Embed before forking: two concurrent embed_query misses would send two identical requests
+        query_embedding = None
+        if self._share_query_embeddings:
+            query_embedding = await asyncio.to_thread(self.cache.embed_query, question)
+
+        retrieval_task = asyncio.create_task(
+            asyncio.to_thread(self._search_documents, question, query_embedding))
+        try:
+            cache_results = await asyncio.to_thread(self.cache.check, question, None, 1, query_embedding)
+        except BaseException:
+            await self._discard(retrieval_task)
+            raise
+
+        if cache_results.hit:
+            await self._discard(retrieval_task)
+            best_match = cache_results.best_match
+            return {
+                "answer": best_match.response,
+                "cache_hit": True,
+                "cache_info": {
+                    "matched_question": best_match.prompt,
+                    "distance": best_match.vector_distance,
+                    "similarity": best_match.cosine_similarity
+                }
+            }
+
+        try:
+            prefetched_retrieval = (question, await retrieval_task)
+        except Exception:
+            prefetched_retrieval = None  # the workflow retries the search itself
+
+        try:
+            answer, last_node = await self._arun_graph(question, prefetched_retrieval)
+            self._write_back(question, last_node, answer)
+        except Exception as e:
+            if "recursion" in str(e).lower():
+                answer = RECURSION_ERROR_ANSWER
+            else:
+                raise
+
+        return {
+            "answer": answer,
+            "cache_hit": False,
+            "cache_info": None
+        }
+
+    @staticmethod
+    async def _discard(task: asyncio.Task):
+        """
+        Cancel a speculative task and wait for it, so it is never left pending.
+
+        A task wrapping asyncio.to_thread only stops being awaited: the worker
+        thread already running the search cannot be interrupted and finishes in
+        the background, its result dropped.
+        """
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await task
+
+    async def _arun_graph(self, question: str, prefetched_retrieval: Optional[tuple] = None) -> tuple[str, str]:
+        """Run the RAG workflow asynchronously and return the final answer and the node that produced it."""
+        result = None
+        last_node = None
+        async for chunk in self.graph.astream(
+            self._initial_state(question),
+            config=self._graph_config(prefetched_retrieval)
+        ):
+            for node, update in chunk.items():
+                result = update
+                last_node = node
+        return result["messages"][-1].content, last_node
+
+    def query_batch(self, questions: list[str], max_concurrency: int = 8) -> list[dict]:
+        """
+        Query the chatbot with many questions at once (evaluation, cache warming).
+
+        All questions are checked against the cache in one batched lookup; the
+        misses then run through the RAG workflow concurrently.
+
+        Args:
+            questions: User questions
+            max_concurrency: Maximum number of RAG workflows running at the same time
+
+        Returns:
+            One dictionary per question, in order, with 'answer', 'cache_hit',
+            and 'cache_info' (same as query)
+        """
+        responses = [None] * len(questions)
+        misses = []
+
+        for i, cache_results in enumerate(self.cache.check_batch(questions, num_results=1)):
+            if cache_results.hit:
+                best_match = cache_results.best_match
+                responses[i] = {
+                    "answer": best_match.response,
+                    "cache_hit": True,
+                    "cache_info": {
+                        "matched_question": best_match.prompt,
+                        "distance": best_match.vector_distance,
+                        "similarity": best_match.cosine_similarity
+                    }
+                }
+            else:
+                misses.append(i)
+
+        if not misses:
+            return responses
+
+        if self.graph is None:
+            raise ValueError("Graph not initialized. Load vectorstore first.")
+
+        config = self._graph_config()
+        config["max_concurrency"] = max_concurrency
+        outputs = self.graph.batch(
+            [self._initial_state(questions[i]) for i in misses],
+            config=config,
+            return_exceptions=True
+        )
+
+        for i, output in zip(misses, outputs):
+            if isinstance(output, Exception):
+                if "recursion" not in str(output).lower():
+                    raise output
+                answer = RECURSION_ERROR_ANSWER
+            else:
+                answer = output["messages"][-1].content
+                self._write_back(questions[i], self._answer_node(output), answer)
+
+            responses[i] = {
+                "answer": answer,
+                "cache_hit": False,
+                "cache_info": None
+            }
+
+        return responses
+
+    def _answer_node(self, state: dict) -> str:
+        """Name of the node that produced the final answer of a finished run."""
+        messages = state["messages"]
+        if len(messages) < 2 or not isinstance(messages[-2], ToolMessage):
+            return "generate_query_or_respond"
+        # Grading only routes to the fallback once the retries are used up
+        if state["retry_count"] >= self.max_retries:
+            return "generate_fallback"
+        return "generate_answer"
+
+    @staticmethod
+    def _initial_state(question: str) -> dict:
+        """Input state for one run of the RAG workflow."""
+        return {
+            "messages": [{"role": "user", "content": question}],
+            "retry_count": 0,
+            "question": question
+        }
+
+    def _write_back(self, question: str, node: str, answer: str):
+        """Cache an answer generated from relevant documents when write-back is enabled."""
+        # Fallback and direct answers are not grounded in the docs, so they are never cached
+        if self.cache_writeback and node == "generate_answer":
+            self.cache.add_pair(question, answer)
+
     def add_to_cache(self, question: str, answer: str):
         """
         Manually add a Q&A pair to the cache.
@@ -374,6 +777,8 @@ class CachedRAGChatbot:
         """
         Query with streaming (for interactive use).
         Checks cache first, then streams RAG results if cache miss.
+        Answer tokens are yielded as they are generated ("token" events),
+        before the node that produces them completes.
 
         Yields:
             Dictionary with status updates and results
@@ -402,13 +807,24 @@ class CachedRAGChatbot:
 
         try:
             final_answer = None
-            config = {"recursion_limit": 50}
+            last_node = None
+            config = self._graph_config()
 
-            for chunk in self.graph.stream(
-                {"messages": [{"role": "user", "content": question}],
-                    "retry_count": 0},
-                config=config
+            for mode, chunk in self.graph.stream(
+                self._initial_state(question),
+                config=config,
+                stream_mode=["updates", "messages"]
             ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if ANSWER_TAG in metadata.get("tags", []) and message.content:
+                        yield {
+                            "type": "token",
+                            "node": metadata["langgraph_node"],
+                            "content": message.content
+                        }
+                    continue
+
                 for node, update in chunk.items():
                     yield {
                         "type": "node_update",
@@ -416,7 +832,9 @@ class CachedRAGChatbot:
                         "messages": update["messages"]
                     }
                     final_answer = update["messages"][-1].content
+                    last_node = node
 
+            self._write_back(question, last_node, final_answer)
             yield {
                 "type": "complete",
                 "answer": final_answer
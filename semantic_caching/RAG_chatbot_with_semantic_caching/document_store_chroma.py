@@ -3,11 +3,13 @@ Document Vectorstore Module with ChromaDB
 Manages the document collection for RAG retrieval with persistent storage.
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from langchain_chroma import Chroma
+from langchain_chroma.vectorstores import maximal_marginal_relevance
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+import numpy as np
 import os
 from pyprojroot import here
 
@@ -165,6 +167,82 @@ class DocumentVectorStore:
 
         return self.vectorstore.similarity_search(query, k=k)
 
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """
+        Perform similarity search and return the Chroma distance of each document.
+
+        Args:
+            query: Search query
+            k: Number of results
+
+        Returns:
+            List of (document, distance) tuples, closest first
+        """
+        if self.vectorstore is None:
+            raise ValueError(
+                "Vectorstore not initialized. Load or create documents first.")
+
+        return self.vectorstore.similarity_search_with_score(query, k=k)
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """
+        Perform similarity search with a precomputed query embedding.
+
+        Args:
+            embedding: Query embedding from the same model as self.embeddings
+            k: Number of results
+
+        Returns:
+            List of (document, distance) tuples, closest first
+        """
+        if self.vectorstore is None:
+            raise ValueError(
+                "Vectorstore not initialized. Load or create documents first.")
+
+        return self.vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+
+    def max_marginal_relevance_search_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5
+    ) -> List[Tuple[Document, float]]:
+        """
+        Perform maximal marginal relevance search, keeping the Chroma distances.
+
+        Args:
+            embedding: Query embedding from the same model as self.embeddings
+            k: Number of results
+            fetch_k: Number of nearest documents to pick the results from
+            lambda_mult: 0 for maximum diversity, 1 for plain similarity
+
+        Returns:
+            List of (document, distance) tuples in selection order
+        """
+        if self.vectorstore is None:
+            raise ValueError(
+                "Vectorstore not initialized. Load or create documents first.")
+
+        results = self.vectorstore._collection.query(
+            query_embeddings=[embedding],
+            n_results=fetch_k,
+            include=["metadatas", "documents", "distances", "embeddings"]
+        )
+        selected = maximal_marginal_relevance(
+            np.array(embedding, dtype=np.float32),
+            results["embeddings"][0],
+            k=k,
+            lambda_mult=lambda_mult
+        )
+        candidates = list(zip(
+            results["documents"][0], results["metadatas"][0], results["distances"][0]))
+
+        return [
+            (Document(page_content=text, metadata=metadata or {}), distance)
+            for text, metadata, distance in (candidates[i] for i in selected)
+        ]
+
     def get_stats(self) -> dict:
         """
         Get statistics about the vectorstore.
@@ -3,11 +3,12 @@ Semantic Cache Module for RAG Chatbot
 Uses OpenAI embeddings for semantic matching of cached Q&A pairs.
 """
 
+import csv
+import functools
 from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
-from langchain_core.vectorstores import InMemoryVectorStore
-from langchain_core.documents import Document
 
 
 @dataclass
@@ -37,6 +38,22 @@ class CacheResults:
         return self.matches[0] if self.matches else None
 
 
+def read_pairs_from_file(filepath: str) -> List[Tuple[str, str]]:
+    """
+    Read (question, answer) pairs from a CSV file with 'question' and 'answer' columns.
+
+    Columns are located once from the header, so rows are read as plain lists.
+    """
+    with open(filepath, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return []
+        question_col = header.index('question')
+        answer_col = header.index('answer')
+        return [(row[question_col], row[answer_col]) for row in reader if row]
+
+
 class SemanticCache:
     """
     Semantic cache using OpenAI embeddings for meaning-based matching.
@@ -45,16 +62,77 @@ class SemanticCache:
     thing as "How do I get a refund?"
     """
 
-    def __init__(self, distance_threshold: float = 0.3):
+    def __init__(self, distance_threshold: float = 0.3, quantize_embeddings: bool = False):
         """
         Args:
             distance_threshold: Maximum cosine distance for a match (default 0.3)
                               Lower = stricter matching, Higher = looser matching
+            quantize_embeddings: Store cached embeddings as int8 with a per-row scale
+                              (4x less resident memory, distances change by ~1e-3).
+                              This trades speed for memory: NumPy upcasts the int8
+                              matrix to float32 for every lookup, so each check is
+                              slower and briefly allocates a float32 copy
         """
         self.distance_threshold = distance_threshold
         self.embeddings = OpenAIEmbeddings()
-        self.vectorstore: Optional[InMemoryVectorStore] = None
         self.qa_pairs: List[Tuple[str, str]] = []
+        # Unit-normalized question embeddings, row i belongs to qa_pairs[i].
+        # The matrix is a view of a buffer that grows by doubling, so adding a
+        # pair doesn't copy the whole cache.
+        self.quantize_embeddings = quantize_embeddings
+        self._embedding_buffer: Optional[np.ndarray] = None
+        self._embedding_matrix: Optional[np.ndarray] = None
+        # Per-row dequantization scales, only used with quantize_embeddings
+        self._scale_buffer: Optional[np.ndarray] = None
+        self._row_scales: Optional[np.ndarray] = None
+        # Repeated questions (retries, approvals, dev reruns) reuse their embedding
+        self.embed_query = functools.lru_cache(maxsize=4096)(self._embed_query)
+
+    def _embed_query(self, text: str) -> np.ndarray:
+        """Embed a single query as a read-only, unit-normalized float32 vector."""
+        vector = self._normalize(np.asarray(self.embeddings.embed_query(text), dtype=np.float32))
+        vector.setflags(write=False)
+        return vector
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Scale vectors to unit length so a dot product is the cosine similarity."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _append_rows(self, rows: np.ndarray):
+        """Append normalized embedding rows, doubling the buffer when it is full."""
+        size = 0 if self._embedding_matrix is None else len(self._embedding_matrix)
+        needed = size + len(rows)
+        if self._embedding_buffer is None or needed > len(self._embedding_buffer):
+            capacity = max(needed, 2 * (0 if self._embedding_buffer is None else len(self._embedding_buffer)), 16)
+            dtype = np.int8 if self.quantize_embeddings else np.float32
+            buffer = np.empty((capacity, rows.shape[1]), dtype=dtype)
+            if size:
+                buffer[:size] = self._embedding_matrix
+            self._embedding_buffer = buffer
+            if self.quantize_embeddings:
+                scales = np.empty(capacity, dtype=np.float32)
+                if size:
+                    scales[:size] = self._row_scales
+                self._scale_buffer = scales
+
+        if self.quantize_embeddings:
+            # Symmetric int8 per row: row ~= codes * scale
+            row_scales = np.abs(rows).max(axis=1) / 127
+            row_scales[row_scales == 0] = 1
+            self._embedding_buffer[size:needed] = np.round(rows / row_scales[:, np.newaxis])
+            self._scale_buffer[size:needed] = row_scales
+            self._row_scales = self._scale_buffer[:needed]
+        else:
+            self._embedding_buffer[size:needed] = rows
+        self._embedding_matrix = self._embedding_buffer[:needed]
+
+    def _add_embeddings(self, questions: List[str]):
+        """Embed questions in one batched request and append them to the matrix."""
+        if not questions:
+            return
+        self._append_rows(self._normalize(np.asarray(self.embeddings.embed_documents(questions), dtype=np.float32)))
 
     def hydrate_from_pairs(self, pairs: List[Tuple[str, str]], clear: bool = True):
         """
@@ -66,24 +144,16 @@ class SemanticCache:
         """
         if clear:
             self.qa_pairs = []
-            self.vectorstore = None
+            self._embedding_buffer = None
+            self._embedding_matrix = None
+            self._scale_buffer = None
+            self._row_scales = None
 
+        pairs = list(pairs)
         self.qa_pairs.extend(pairs)
 
-        # Create documents with questions as content and answers in metadata
-        documents = [
-            Document(
-                page_content=question,
-                metadata={"answer": answer, "question": question}
-            )
-            for question, answer in self.qa_pairs
-        ]
-
-        # Create or update vectorstore
-        self.vectorstore = InMemoryVectorStore.from_documents(
-            documents=documents,
-            embedding=self.embeddings
-        )
+        # Embed only the new questions, all in one batched request
+        self._add_embeddings([question for question, _ in pairs])
 
     def add_pair(self, question: str, answer: str):
         """
@@ -95,22 +165,11 @@ class SemanticCache:
         """
         self.qa_pairs.append((question, answer))
 
-        # Add to existing vectorstore
-        doc = Document(
-            page_content=question,
-            metadata={"answer": answer, "question": question}
-        )
-
-        if self.vectorstore is None:
-            self.vectorstore = InMemoryVectorStore.from_documents(
-                documents=[doc],
-                embedding=self.embeddings
-            )
-        else:
-            self.vectorstore.add_documents([doc])
+        # The question has usually just been checked, so its embedding is cached
+        self._append_rows(self.embed_query(question)[np.newaxis, :])
 
     def check(self, query: str, distance_threshold: Optional[float] = None,
-              num_results: int = 1) -> CacheResults:
+              num_results: int = 1, query_embedding: Optional[np.ndarray] = None) -> CacheResults:
         """
         Check cache for semantic matches.
 
@@ -118,32 +177,81 @@ class SemanticCache:
             query: The query string
             distance_threshold: Override default threshold
             num_results: Number of results to return
+            query_embedding: Precomputed unit-normalized query embedding (default: embed_query(query))
 
         Returns:
             CacheResults with matches (empty if none within threshold)
         """
-        if self.vectorstore is None or not self.qa_pairs:
+        if self._embedding_matrix is None or not self.qa_pairs:
             return CacheResults(query=query, matches=[])
 
         threshold = distance_threshold if distance_threshold is not None else self.distance_threshold
 
-        # Use similarity search with scores
-        results = self.vectorstore.similarity_search_with_score(
-            query, k=num_results
-        )
+        # Cosine similarity to every cached question in one matrix-vector product
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+        similarities = self._embedding_matrix @ query_embedding
+        if self._row_scales is not None:
+            similarities *= self._row_scales
+
+        return self._matches(query, similarities, threshold, num_results)
+
+    def check_batch(self, queries: List[str], distance_threshold: Optional[float] = None,
+                    num_results: int = 1) -> List[CacheResults]:
+        """
+        Check cache for semantic matches of several queries at once.
+
+        The queries are embedded in one batched request and compared with every
+        cached question in a single matrix product.
+
+        Args:
+            queries: The query strings
+            distance_threshold: Override default threshold
+            num_results: Number of results to return per query
+
+        Returns:
+            One CacheResults per query, in the same order
+        """
+        if self._embedding_matrix is None or not self.qa_pairs or not queries:
+            return [CacheResults(query=query, matches=[]) for query in queries]
+
+        threshold = distance_threshold if distance_threshold is not None else self.distance_threshold
+
+        query_embeddings = self._normalize(
+            np.asarray(self.embeddings.embed_documents(list(queries)), dtype=np.float32))
+        # (cached questions, queries) similarity matrix
+        similarities = self._embedding_matrix @ query_embeddings.T
+        if self._row_scales is not None:
+            similarities *= self._row_scales[:, np.newaxis]
+
+        return [
+            self._matches(query, similarities[:, i], threshold, num_results)
+            for i, query in enumerate(queries)
+        ]
+
+    def _matches(self, query: str, similarities: np.ndarray, threshold: float,
+                 num_results: int) -> CacheResults:
+        """Turn one query's similarities to the cached questions into ranked matches."""
+        # Keep only entries within the threshold, then rank just those; usually
+        # none or a handful qualify, so the selection work is tiny
+        candidates = np.flatnonzero(similarities >= 1 - threshold)
+        if len(candidates) > num_results:
+            candidates = candidates[np.argpartition(-similarities[candidates], num_results - 1)[:num_results]]
+        top = candidates[np.argsort(-similarities[candidates], kind="stable")]
 
         matches = []
-        for doc, score in results:
-            # Convert similarity score to distance (lower is better)
-            # LangChain returns similarity scores, we need distance
-            distance = 1 - score if score <= 1 else score
+        for idx in top:
+            # Clip float rounding so an exact match has distance 0, not 1 - 1.0000001
+            similarity = min(float(similarities[idx]), 1.0)
+            distance = 1 - similarity
 
             if distance <= threshold:
+                question, answer = self.qa_pairs[idx]
                 matches.append(CacheResult(
-                    prompt=doc.metadata["question"],
-                    response=doc.metadata["answer"],
-                    vector_distance=float(distance),
-                    cosine_similarity=float(1 - distance)
+                    prompt=question,
+                    response=answer,
+                    vector_distance=distance,
+                    cosine_similarity=similarity
                 ))
 
         return CacheResults(query=query, matches=matches)
@@ -154,23 +262,15 @@ class SemanticCache:
 
     def save_to_file(self, filepath: str):
         """Save cache pairs to a CSV file."""
-        import csv
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['question', 'answer'])
             writer.writerows(self.qa_pairs)
 
     @classmethod
-    def load_from_file(cls, filepath: str, distance_threshold: float = 0.3):
+    def load_from_file(cls, filepath: str, distance_threshold: float = 0.3,
+                       quantize_embeddings: bool = False):
         """Load cache from a CSV file."""
-        import csv
-        cache = cls(distance_threshold=distance_threshold)
-        pairs = []
-
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                pairs.append((row['question'], row['answer']))
-
-        cache.hydrate_from_pairs(pairs)
+        cache = cls(distance_threshold=distance_threshold, quantize_embeddings=quantize_embeddings)
+        cache.hydrate_from_pairs(read_pairs_from_file(filepath))
         return cache
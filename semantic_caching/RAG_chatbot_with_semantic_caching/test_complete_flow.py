@@ -261,6 +261,54 @@ def test_streamlit_flow():
     return True
 
 
+def test_distance_grading():
+    """Test 6: Verify the retrieval-distance short-circuit is opt-in."""
+    print("\n" + "=" * 70)
+    print("TEST 6: DISTANCE GRADING TEST")
+    print("=" * 70)
+
+    from types import SimpleNamespace
+    from langchain_core.messages import ToolMessage
+    from cached_rag_chatbot_chroma import grade_documents
+
+    grader_calls = []
+    grader = SimpleNamespace(invoke=lambda messages: grader_calls.append(messages) or SimpleNamespace(binary_score="yes"))
+
+    def grade(distance, relevant_distance=None, irrelevant_distance=None):
+        chatbot = SimpleNamespace(max_retries=2, relevant_distance=relevant_distance,
+                                  irrelevant_distance=irrelevant_distance, _grader=grader)
+        state = {
+            "question": "How do I create a new project?",
+            "messages": [ToolMessage(content="Projects are created from the sidebar.",
+                                     artifact=distance, tool_call_id="call_1")],
+            "retry_count": 0
+        }
+        grader_calls.clear()
+        decision = grade_documents(state, {"configurable": {"chatbot": chatbot}})
+        return decision, len(grader_calls)
+
+    print("\n🧪 Testing default (no distance cutoffs)...")
+    if grade(0.01) != ("generate_answer", 1) or grade(1.9) != ("generate_answer", 1):
+        print("  ✗ Distance decided the grade without cutoffs")
+        return False
+    print("  ✓ LLM grader used for every retrieval")
+
+    print("\n🧪 Testing configured cutoffs...")
+    if grade(0.1, relevant_distance=0.3, irrelevant_distance=1.2) != ("generate_answer", 0):
+        print("  ✗ Close retrieval was not accepted without the grader")
+        return False
+    if grade(1.5, relevant_distance=0.3, irrelevant_distance=1.2) != ("rewrite_question", 0):
+        print("  ✗ Distant retrieval was not rewritten without the grader")
+        return False
+    if grade(0.7, relevant_distance=0.3, irrelevant_distance=1.2) != ("generate_answer", 1):
+        print("  ✗ Ambiguous retrieval skipped the grader")
+        return False
+    print("  ✓ Clear cases skip the grader, ambiguous ones use it")
+
+    print("\n✅ Distance grading test complete!")
+    return True
+
+
 def print_flow_diagram():
     """Print the complete flow diagram."""
     print("\n" + "=" * 70)
@@ -343,6 +391,7 @@ def main():
         ("Cache Miss + RAG", test_cache_miss_rag),
         ("ChromaDB Retrieval", test_chromadb_retrieval),
         ("Streamlit Flow", test_streamlit_flow),
+        ("Distance Grading", test_distance_grading),
     ]
 
     results = []